@@ -1,53 +1,421 @@
+import os
 from PyQt5 import QtCore, QtWidgets
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import matplotlib.pyplot as plt
+import numbers
 import numpy as np
 import random
+import time
+
+from column_store import ANALYSIS_WINDOW, ColumnStore
+from downsample import DOWNSAMPLE, DownsampleCache, downsample
+from lod_pyramid import LODPyramid
+from metric_registry import metrics as metric_registry
+from telemetry_store import TELEMETRY_DIR, TelemetrySession
+
+# "blit" updates line data in place over cached backgrounds, "full" clears and redraws everything
+RENDER_MODE = os.getenv("GCS_ANALYSIS_RENDER", "blit")
+
 
 class AnalysisModule(QtWidgets.QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, simulate=True, window=ANALYSIS_WINDOW, render_mode=RENDER_MODE,
+                 downsample_method=DOWNSAMPLE, metrics=metric_registry):
         super().__init__(parent)
+        self.metrics = metrics
+        self.render_mode = render_mode
+        self.downsample_method = downsample_method
+        self._cache = DownsampleCache()
+        self._epoch = 0  # bumped on reset so cached series of an old session are never reused
 
         layout = QtWidgets.QVBoxLayout(self)
 
-        # Create matplotlib figure
-        self.figure, self.ax = plt.subplots(3, 1, figsize=(6, 8))
+        # Session / view controls
+        bar = QtWidgets.QHBoxLayout()
+        self.btn_open = QtWidgets.QPushButton("Open Session")
+        self.btn_live = QtWidgets.QPushButton("Live")
+        self.btn_fit = QtWidgets.QPushButton("Fit")
+        self.btn_channels = QtWidgets.QToolButton()
+        self.btn_channels.setText("Channels")
+        self.btn_channels.setPopupMode(QtWidgets.QToolButton.InstantPopup)
+        self.btn_channels.setMenu(QtWidgets.QMenu(self.btn_channels))
+        self._channel_actions = {}
+        self.view_label = QtWidgets.QLabel("live")
+        for w in (self.btn_open, self.btn_live, self.btn_fit, self.btn_channels):
+            bar.addWidget(w)
+        bar.addWidget(self.view_label, 1)
+        layout.addLayout(bar)
+        self.btn_open.clicked.connect(self._open_session)
+        self.btn_live.clicked.connect(self.show_live)
+        self.btn_fit.clicked.connect(self.fit)
+
+        # Create matplotlib figure (one time axis for all plots: zoom and pan move them together)
+        self.figure = plt.figure(figsize=(6, 8))
         self.canvas = FigureCanvas(self.figure)
         layout.addWidget(self.canvas)
 
-        # Data buffers
-        self.data = {
-            "battery": [],
-            "speed": [],
-            "temp": [],
-            "time": []
-        }
+        # Data buffers: fixed raw window + min/max long-term tier, memory does not grow with the mission.
+        # Every registered metric is stored, so enabling one later shows its history too.
+        self.data = ColumnStore(self.metrics.names(), window=window)
+        self._held = {}  # last value of every field, telemetry dicts may carry only some of them
+
+        # Session review: a recorded session behind a level-of-detail pyramid
+        self._session = None
+        self.pyramid = None
+
+        # View: following the live edge, or a time range the user zoomed/panned to
+        self._follow = True
+        self._view = None          # (x0, x1) when not following
+        self._view_changed = False
+        self._drag = None
+        self.canvas.mpl_connect("scroll_event", self._on_scroll)
+        self.canvas.mpl_connect("button_press_event", self._on_press)
+        self.canvas.mpl_connect("motion_notify_event", self._on_motion)
+        self.canvas.mpl_connect("button_release_event", self._on_release)
 
-        # Timer for simulating data updates
+        # one subplot per enabled metric; blit mode keeps persistent artists and
+        # caches the axes backgrounds after every full draw
+        self.ax = []
+        self._channels = []
+        self._lines = []
+        self._bands = []
+        self._backgrounds = None
+        self._build_axes()
+        self._build_menu()
+        if self.render_mode == "blit":
+            self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.metrics.changed.connect(self._on_metrics_changed)
+
+        self._t0 = None
+        self._dirty = False
+
+        # Timer for simulating data updates (off when real telemetry is fed in through ingest)
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update_data)
-        self.timer.start(1000)
+        if simulate:
+            self.timer.start(1000)
+
+        # ingest() only stores; redraw at most once a second however fast samples come
+        self.redraw_timer = QtCore.QTimer()
+        self.redraw_timer.timeout.connect(self._redraw)
+        self.redraw_timer.start(1000)
 
     def update_data(self):
-        t = len(self.data["time"]) + 1
-        self.data["time"].append(t)
-        self.data["battery"].append(max(0, 100 - t * 0.5 + random.uniform(-1, 1)))
-        self.data["speed"].append(abs(random.gauss(1.5, 0.5)))
-        self.data["temp"].append(20 + random.uniform(-2, 2))
+        t = len(self.data) + 1
+        self.data.append(t, {"battery": max(0, 100 - t * 0.5 + random.uniform(-1, 1)),
+                             "speed": abs(random.gauss(1.5, 0.5)),
+                             "temp": 20 + random.uniform(-2, 2)})
 
         self.plot()
 
-    def plot(self):
-        self.ax[0].clear()
-        self.ax[0].plot(self.data["time"], self.data["battery"], color="green")
-        self.ax[0].set_title("Battery Life (%)")
+    def ingest(self, telemetry):
+        """ Take one telemetry dict (live or replayed); t defaults to now """
+        self.ingest_many((telemetry,))
+
+    def ingest_many(self, samples):
+        """ Take a batch of telemetry dicts in one store write.
+
+        A field missing from a sample keeps its last value, so partial updates (a servo
+        move, a camera fps report) do not punch holes in the other channels. Numeric
+        fields nobody registered yet become (disabled) channels of their own.
+        """
+        if not samples:
+            return
+        new = {k for s in samples for k, v in s.items()
+               if k != "t" and k not in self.metrics and isinstance(v, numbers.Real) and not isinstance(v, bool)}
+        for name in sorted(new):
+            self.metrics.register(name)
+        names, held, now = self.data.names, self._held, time.time()
+        rows = np.empty((len(samples), 1 + len(names)))
+        for i, s in enumerate(samples):
+            held.update(s)
+            rows[i, 0] = s.get("t", now)
+            rows[i, 1:] = [held.get(n, np.nan) for n in names]
+        if self._t0 is None:
+            self._t0 = rows[0, 0]
+        rows[:, 0] -= self._t0
+        self.data.extend(rows)
+        self._dirty = True
+
+    def reset(self):
+        self._epoch += 1
+        self._cache.clear()
+        self.data.clear()
+        self._held = {}
+        self._t0 = None
+        self._dirty = True
+        self._reset_limits()
+
+    def _reset_limits(self):
+        # the live view only ever widens its limits, start it from scratch
+        for ax in self.ax:
+            ax.set_xlim(0, 1)
+            ax.set_ylim(0, 1)
+
+    def _redraw(self):
+        if self._dirty:
+            self._dirty = False
+            self.plot()
+
+    # ---------------- Channels ----------------
+    def _build_axes(self):
+        """ One subplot per enabled metric, all on the shared time axis """
+        self._channels = self.metrics.enabled()
+        self.figure.clear()
+        n = len(self._channels)
+        self.ax = list(self.figure.subplots(n, 1, sharex=True, squeeze=False)[:, 0]) if n else []
+        self._lines, self._bands = [], []
+        self._backgrounds = None
+        for ax, m in zip(self.ax, self._channels):
+            ax.set_title(m.title)
+            if self.render_mode == "blit":
+                band, = ax.plot([], [], color=m.color, alpha=0.3, linewidth=1, animated=True)
+                line, = ax.plot([], [], color=m.color, animated=True)
+                self._bands.append(band)
+                self._lines.append(line)
+        self._reset_limits()
+        self._view_changed = True
+
+    def _build_menu(self):
+        # actions are only ever added and re-checked: changed can fire from inside a toggle
+        menu = self.btn_channels.menu()
+        for m in self.metrics:
+            act = self._channel_actions.get(m.name)
+            if act is None:
+                act = self._channel_actions[m.name] = menu.addAction(m.title)
+                act.setCheckable(True)
+                act.toggled.connect(lambda on, name=m.name: self.metrics.set_enabled(name, on))
+            act.blockSignals(True)
+            act.setText(m.title)
+            act.setChecked(m.enabled)
+            act.blockSignals(False)
+
+    def _on_metrics_changed(self):
+        for name in self.metrics.names():
+            self.data.add_column(name)
+        if self.pyramid is not None and any(n not in self.pyramid.columns for n in self.data.names):
+            self._build_pyramid()
+        self._build_menu()
+        if [m.name for m in self.metrics.enabled()] != [m.name for m in self._channels] or \
+                any(ax.get_title() != m.title for ax, m in zip(self.ax, self._channels)):
+            self._build_axes()
+            self.plot()
+
+    # ---------------- Session review ----------------
+    def _open_session(self):
+        path = QtWidgets.QFileDialog.getExistingDirectory(self, "Open Telemetry Session", TELEMETRY_DIR)
+        if path:
+            self.load_session(path)
+
+    def load_session(self, session):
+        """ Show a recorded session (path or TelemetrySession), zoomable down to single samples """
+        if not isinstance(session, TelemetrySession):
+            session = TelemetrySession(session)
+        self._session = session
+        self._build_pyramid()
+        self.fit()
+
+    def _build_pyramid(self):
+        session = self._session
+        t = session.column("t")
+        t = t - t[0] if len(t) else t
+        cols = {name: session.column(name) if name in session.names else np.full(len(t), np.nan)
+                for name in self.data.names}
+        self.pyramid = LODPyramid(t, cols)
+
+    def show_live(self):
+        self._session = None
+        self.pyramid = None
+        self._follow = True
+        self._view_changed = True
+        self._reset_limits()
+        self.plot()
+
+    # ---------------- Zoom / pan ----------------
+    def fit(self):
+        """ Whole session in review, back to following the live edge otherwise """
+        if self.pyramid is not None and len(self.pyramid):
+            self.set_view(float(self.pyramid.t[0]), float(self.pyramid.t[-1]))
+        else:
+            self.show_live()
+
+    def set_view(self, x0, x1):
+        self._follow = False
+        self._view = (x0, x1)
+        self._view_changed = True
+        self.plot()
+
+    def _on_scroll(self, event):
+        if event.inaxes is None or event.xdata is None:
+            return
+        x0, x1 = self._current_xlim()
+        f = 0.8 if event.button == "up" else 1.25
+        c = event.xdata
+        self.set_view(c - (c - x0) * f, c + (x1 - c) * f)
+
+    def _on_press(self, event):
+        if event.dblclick:
+            self.fit()
+        elif event.inaxes is not None and event.button == 1:
+            self._drag = (event.x, self._current_xlim(), event.inaxes.bbox.width)
+
+    def _on_motion(self, event):
+        if self._drag is None:
+            return
+        px, (x0, x1), width = self._drag
+        dx = (event.x - px) * (x1 - x0) / width
+        self.set_view(x0 - dx, x1 - dx)
+
+    def _on_release(self, event):
+        self._drag = None
+
+    def _current_xlim(self):
+        if not self._follow:
+            return self._view
+        return self.ax[0].get_xlim() if self.ax else self._live_span()
+
+    # ---------------- Series ----------------
+    def _decimated(self, ax, name, t, y, xlim=None):
+        """ The part of (t, y) around the visible x range (default: ax limits), cut to about one point per pixel.
+
+        The range is snapped to power-of-two blocks (one block of margin either side), so
+        panning inside it or coming back to a zoom level reuses the cached result.
+        """
+        width = max(int(ax.bbox.width), 100)
+        if self.downsample_method == "none" or len(t) <= 2 * width:
+            return t, y
+        x0, x1 = ax.get_xlim() if xlim is None else xlim
+        level = int(np.ceil(np.log2(max(x1 - x0, 1e-6))))
+        block = 2.0 ** level
+        first = int(np.floor(x0 / block)) - 1
+        key = (name, self.downsample_method, width, level, first, self._epoch, len(self.data))
 
-        self.ax[1].clear()
-        self.ax[1].plot(self.data["time"], self.data["speed"], color="blue")
-        self.ax[1].set_title("Speed (m/s)")
+        def compute():
+            i0, i1 = np.searchsorted(t, (first * block, (first + 4) * block))
+            return downsample(t[i0:i1], y[i0:i1], 4 * width, self.downsample_method)
+        return self._cache.get(key, compute)
 
-        self.ax[2].clear()
-        self.ax[2].plot(self.data["time"], self.data["temp"], color="red")
-        self.ax[2].set_title("Temperature (°C)")
+    def _history_before(self, name, t_start):
+        """ Long-term min/max buckets older than t_start """
+        t0, t1, lo, hi = self.data.history(name)
+        older = t1 < t_start
+        return (t0[older] + t1[older]) / 2, lo[older], hi[older]
+
+    def _series(self, ax, name, xlim):
+        """ (t_line, y_line, t_band, lo, hi) to draw for xlim """
+        if self.pyramid is not None:
+            return self.pyramid.query(name, xlim[0], xlim[1], 2 * max(int(ax.bbox.width), 100))
+        t = self.data.times()
+        mid, lo, hi = self._history_before(name, t[0] if len(t) else np.inf)
+        t_line, y_line = self._decimated(ax, name, t, self.data.column(name), xlim)
+        return t_line, y_line, mid, lo, hi
+
+    def _live_span(self):
+        t = self.data.times()
+        if not len(t) or not self.data.names:
+            return 0.0, 1.0
+        t_first = self.data.history(self.data.names[0])[0]
+        return float(min(t[0], t_first[0]) if len(t_first) else t[0]), float(t[-1])
+
+    def _update_label(self, x0, x1):
+        if self.pyramid is None and self._follow:
+            self.view_label.setText("live")
+        else:
+            source = "session" if self.pyramid is not None else "live (paused view)"
+            self.view_label.setText(f"{source}: {x0:.1f} - {x1:.1f} s")
+
+    def plot(self):
+        if not self.ax:
+            self.canvas.draw()  # every channel switched off: just the empty figure
+        elif self.render_mode == "blit":
+            self._plot_blit()
+        else:
+            self._plot_full()
+
+    # ---------------- Full redraw ----------------
+    def _plot_full(self):
+        xlim = self._live_span() if self._follow and self.pyramid is None else self._view
+        self._view_changed = False
+        for ax, m in zip(self.ax, self._channels):
+            t_line, y_line, t_band, lo, hi = self._series(ax, m.name, xlim)
+            ax.clear()
+            # min/max band: long-term tier in live view, bucket envelope of the pyramid in review
+            if len(t_band):
+                ax.fill_between(t_band, lo, hi, color=m.color, alpha=0.3, linewidth=0)
+            ax.plot(t_line, y_line, color=m.color)
+            ax.set_title(m.title)
+            if not self._follow:
+                ax.set_xlim(*xlim)
+        self._update_label(*xlim)
 
         self.canvas.draw()
+
+    # ---------------- Incremental (blit) ----------------
+    def _plot_blit(self):
+        rescale = self._backgrounds is None or self._view_changed
+        following = self._follow and self.pyramid is None
+        xlim = self.ax[0].get_xlim() if following else self._view
+        for ax, m, band, line in zip(self.ax, self._channels, self._bands, self._lines):
+            name = m.name
+            if following:
+                t = self.data.times()
+                mid, lo, hi = self._history_before(name, t[0] if len(t) else np.inf)
+                rescale |= self._fit_limits(ax, np.concatenate((mid, t)),
+                                            np.concatenate((lo, hi, self.data.column(name))))
+                xlim = ax.get_xlim()
+            t_line, y_line, t_band, lo, hi = self._series(ax, name, xlim)
+            if not following and self._view_changed:
+                ax.set_xlim(*xlim)
+                self._fit_y(ax, np.concatenate((lo, hi, y_line)))
+            # min/max buckets drawn as vertical strokes: one Line2D, no polygon to rebuild; the nan
+            # after each lo, hi pair breaks the line so buckets are not joined hi -> next lo
+            band.set_data(np.repeat(t_band, 3), np.column_stack((lo, hi, np.full(len(lo), np.nan))).ravel())
+            line.set_data(t_line, y_line)
+        self._view_changed = False
+        self._update_label(*xlim)
+
+        if rescale:
+            self.canvas.draw()  # new ticks/labels; _on_draw re-caches backgrounds and blits the lines
+            return
+        for ax, band, line, bg in zip(self.ax, self._bands, self._lines, self._backgrounds):
+            self.canvas.restore_region(bg)
+            ax.draw_artist(band)
+            ax.draw_artist(line)
+            self.canvas.blit(ax.bbox)
+
+    @staticmethod
+    def _fit_limits(ax, x, y):
+        """ Widen limits (with headroom, so this is rare) when data leaves them; True if changed """
+        y = y[np.isfinite(y)]
+        if not len(x) or not len(y):
+            return False
+        changed = False
+        x0, x1 = ax.get_xlim()
+        xmin, xmax = float(x.min()), float(x.max())
+        if xmin < x0 or xmax > x1:
+            span = max(xmax - xmin, 1.0)
+            ax.set_xlim(xmin, xmax + 0.25 * span)
+            changed = True
+        y0, y1 = ax.get_ylim()
+        ymin, ymax = float(y.min()), float(y.max())
+        if ymin < y0 or ymax > y1:
+            pad = max(0.1 * (ymax - ymin), 0.5)
+            ax.set_ylim(ymin - pad, ymax + pad)
+            changed = True
+        return changed
+
+    @staticmethod
+    def _fit_y(ax, y):
+        """ Tight y limits for what is in view (zoomed views rescale both ways) """
+        y = y[np.isfinite(y)]
+        if len(y):
+            ymin, ymax = float(y.min()), float(y.max())
+            pad = max(0.1 * (ymax - ymin), 0.5)
+            ax.set_ylim(ymin - pad, ymax + pad)
+
+    def _on_draw(self, event):
+        # any full draw (ours, resize, tab switch) invalidates the cached backgrounds.
+        # No blit here: the canvas repaints after every draw anyway, and this may run inside a paint.
+        self._backgrounds = [self.canvas.copy_from_bbox(ax.bbox) for ax in self.ax]
+        for ax, band, line in zip(self.ax, self._bands, self._lines):
+            ax.draw_artist(band)
+            ax.draw_artist(line)
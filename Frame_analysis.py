@@ -1,9 +1,13 @@
-import cv2
-import threading
-from PyQt5 import QtCore, QtWidgets, QtGui
-from PyQt5.QtWebEngineWidgets import QWebEngineView
-import folium
-import io
+import os
+from PyQt5 import QtCore, QtWidgets
+from video_worker import registry as video_registry
+from video_surface import create_surface, show_latest
+from map_page import render_map_page
+from map_service import service as map_service
+
+VIEW_FRAME_SIZE = (320, 240)
+# comma separated source URIs for the three feeds, see video_source
+VIEW_SOURCES = os.getenv("GCS_MULTIVIEW_CAMS", "device:0,device:0,device:0").split(",")
 
 
 class MultiViewModule(QtWidgets.QWidget):
@@ -24,7 +28,7 @@ class MultiViewModule(QtWidgets.QWidget):
         titles = ["Rover Front Cam", "Rover Rear Cam", "Drone Cam"]
 
         for i, title in enumerate(titles):
-            lbl = QtWidgets.QLabel(title)
+            lbl = create_surface(title)
             lbl.setAlignment(QtCore.Qt.AlignCenter)
             lbl.setStyleSheet("background-color: black; color: white; font-size: 14px;")
             lbl.setMinimumSize(300, 200)
@@ -34,22 +38,20 @@ class MultiViewModule(QtWidgets.QWidget):
         splitter.addWidget(video_widget)
 
         # ---------------- Right: Embedded Map ----------------
-        self.map_view = QWebEngineView()
+        self.map_view = map_service.create_view()
         self._load_map()
         splitter.addWidget(self.map_view)
 
-        # Capture threads
-        self.captures = []
+        # Feeds are subscriptions on the shared capture registry; the GUI shows the newest frame
+        self.captures = []  # (source, worker, subscription) per label
         self.running = False
+        self._shown_seq = [0] * len(self.video_labels)
+        self.display_timer = QtCore.QTimer()
+        self.display_timer.timeout.connect(self._show_frames)
 
     def _load_map(self):
-        # Simple folium map
-        m = folium.Map(location=[28.6139, 77.2090], zoom_start=12)  # Delhi coords as demo
-        folium.Marker([28.6139, 77.2090], popup="Rover Location").add_to(m)
-
-        data = io.BytesIO()
-        m.save(data, close_file=False)
-        self.map_view.setHtml(data.getvalue().decode())
+        # Lean map page, rover at Delhi coords as demo; loaded when the tab is first opened
+        map_service.show_page(self.map_view, "multiview.html", render_map_page(28.6139, 77.2090, zoom=12))
 
     # ---------------- Video Capture ----------------
     def start_capture(self):
@@ -57,34 +59,34 @@ class MultiViewModule(QtWidgets.QWidget):
             return
         self.running = True
 
-        # Replace with actual streams for rover/drone
-        sources = [0, 0, 0]  # using laptop cam for demo (all same)
+        # Replace with actual streams for rover/drone (default: laptop cam for all three)
+        sources = VIEW_SOURCES
 
+        # the same device is opened and decoded once, however many feeds show it
         self.captures = []
         for i, src in enumerate(sources):
-            cap = cv2.VideoCapture(src, cv2.CAP_DSHOW)
-            self.captures.append(cap)
-
-            thread = threading.Thread(target=self._update_frame, args=(cap, self.video_labels[i]))
-            thread.daemon = True
-            thread.start()
+            worker, sub = video_registry.subscribe(src, VIEW_FRAME_SIZE)
+            self.captures.append((src, worker, sub))
+            self._shown_seq[i] = 0
+        self.display_timer.start(33)
 
     def stop_capture(self):
         self.running = False
-        for cap in self.captures:
-            if cap.isOpened():
-                cap.release()
+        self.display_timer.stop()
+        was_running = bool(self.captures)
+        for src, _, sub in self.captures:
+            video_registry.unsubscribe(src, sub)
         self.captures = []
-
-    def _update_frame(self, cap, label):
-        while self.running and cap.isOpened():
-            ret, frame = cap.read()
-            if ret:
-                frame = cv2.resize(frame, (320, 240))
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
-                pixmap = QtGui.QPixmap.fromImage(qimg)
-                label.setPixmap(pixmap)
-        label.clear()
-        label.setText("No Signal")
+        if was_running:
+            for label in self.video_labels:
+                label.clear()
+                label.setText("No Signal")
+
+    def _show_frames(self):
+        for i, (_, worker, sub) in enumerate(self.captures):
+            label = self.video_labels[i]
+            if sub.buffer.seq == 0:
+                if worker.is_open is False and label.text() != "No Signal":
+                    label.setText("No Signal")
+                continue
+            self._shown_seq[i] = show_latest(label, sub.buffer, self._shown_seq[i])
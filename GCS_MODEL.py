@@ -12,10 +12,6 @@ Run:
 import sys
 import os
 import time
-import math
-import threading
-import folium
-import cv2
 import numpy as np
 
 from PyQt5 import QtCore, QtGui, QtWidgets
@@ -23,6 +19,17 @@ from Analiysis import AnalysisModule
 from Rover_drone_controlller import FPVController
 from  Frame_analysis import MultiViewModule
 from mission_planner import MissionPlanner
+from video_worker import registry as video_registry
+from video_surface import VIDEO_SURFACE, create_surface, show_latest
+from video_recorder import VideoRecorder, recording_path
+from log_buffer import LogListModel
+from log_sink import LogSink
+from telemetry_store import TELEMETRY_DIR, TelemetryRecorder, session_path
+from telemetry_replay import REPLAY_SPEEDS, TelemetryReplay
+from telemetry_bus import bus as telemetry_bus
+from map_page import MapBridge, generate_map_page, render_map_page
+from map_track import Track
+from tile_server import server as tile_server
 
 # Read environment variable
 
@@ -30,54 +37,14 @@ OSR_KEY = os.getenv("OSR_KEY")
 # Try import QtWebEngineWidgets, fallback to opening map in browser
 try:
     from PyQt5 import QtWebEngineWidgets
+    from map_service import configure as configure_map_engine, service as map_service
     WEBENGINE_AVAILABLE = True
 except Exception:
     WEBENGINE_AVAILABLE = False
     import webbrowser
 
 # ----------------------------
-# Helper: Generate Folium map + JS (safe braces)
-# ----------------------------
-def generate_folium_map(lat=28.6, lon=77.2, fname="rover_map.html"):
-    m = folium.Map(location=[lat, lon], zoom_start=16)
-    folium.Marker([lat, lon], popup="Rover", icon=folium.Icon(color="red")).add_to(m)
-    m.save(fname)
-
-    # Append JS for updateRover and path; escape JS braces by doubling where needed
-    js = """
-<script>
-    var roverMarker = L.marker([{lat}, {lon}]).addTo(map).bindPopup("Rover");
-    var roverPath = L.polyline([[{lat}, {lon}]], {{color: 'blue'}}).addTo(map);
-
-    function updateRover(lat, lon, locked) {{
-        roverMarker.setLatLng([lat, lon]);
-        roverPath.addLatLng([lat, lon]);
-        if (locked) {{
-            // change marker icon to green when locked
-            roverMarker.setIcon(L.icon({{
-                iconUrl: 'https://cdnjs.cloudflare.com/ajax/libs/leaflet/1.7.1/images/marker-icon-2x-green.png',
-                iconSize: [25, 41],
-                iconAnchor: [12, 41],
-                popupAnchor: [1, -34],
-            }}));
-        }} else {{
-            roverMarker.setIcon(L.icon({{
-                iconUrl: 'https://cdnjs.cloudflare.com/ajax/libs/leaflet/1.7.1/images/marker-icon.png',
-                iconSize: [25, 41],
-                iconAnchor: [12, 41],
-                popupAnchor: [1, -34],
-            }}));
-        }}
-    }}
-</script>
-""".format(lat=lat, lon=lon)
-
-    with open(fname, "a", encoding="utf-8") as f:
-        f.write(js)
-    return fname
-
-# ----------------------------
-# Map Widget (Folium + QWebEngine or fallback)
+# Map Widget (Leaflet page + QWebEngine or fallback)
 # ----------------------------
 class MapWidget(QtWidgets.QWidget):
     def __init__(self, lat=28.6, lon=77.2, parent=None):
@@ -85,15 +52,32 @@ class MapWidget(QtWidgets.QWidget):
         self.lat = lat
         self.lon = lon
         self.locked = False
-        self.mapfile = generate_folium_map(lat, lon, fname="rover_map.html")
+        self.bridge = None
+        # full-resolution track lives here; the page only gets its significant vertices
+        self.track = Track()
 
         layout = QtWidgets.QVBoxLayout(self)
         layout.setContentsMargins(0,0,0,0)
+        hdr = QtWidgets.QHBoxLayout()
+        self.track_label = QtWidgets.QLabel("")
+        self.track_label.setStyleSheet("color:#888; font-size:10px;")
+        self.track_label.setToolTip("Track samples kept | vertices drawn on the map")
+        hdr.addWidget(self.track_label)
+        hdr.addStretch()
+        self.btn_export = QtWidgets.QPushButton("Export Track")
+        self.btn_export.setToolTip("Save the full-resolution track as GPX or CSV")
+        self.btn_export.clicked.connect(self.export_track)
+        hdr.addWidget(self.btn_export)
+        layout.addLayout(hdr)
         if WEBENGINE_AVAILABLE:
-            self.view = QtWebEngineWidgets.QWebEngineView()
-            self.view.load(QtCore.QUrl.fromLocalFile(os.path.abspath(self.mapfile)))
+            # shared profile and renderer with the other map views, see map_service
+            self.view = map_service.create_view()
+            # the page is loaded once; after that it only gets batched gcs.apply() calls
+            self.bridge = MapBridge(self.view.page(), parent=self)
+            map_service.show_page(self.view, "rover.html", render_map_page(lat, lon))
             layout.addWidget(self.view)
         else:
+            self.mapfile = generate_map_page(lat, lon, fname="rover_map.html")
             # fallback: show label and open map in default browser
             label = QtWidgets.QLabel("Map preview unavailable (PyQtWebEngine not installed). Map will open in browser.")
             label.setWordWrap(True)
@@ -101,26 +85,51 @@ class MapWidget(QtWidgets.QWidget):
             webbrowser.open('file://' + os.path.abspath(self.mapfile))
 
     def update_position(self, lat, lon):
-        self.lat = lat
-        self.lon = lon
-        if WEBENGINE_AVAILABLE:
-            # pass locked flag (1 or 0)
-            js = f"updateRover({lat}, {lon}, {1 if self.locked else 0});"
-            self.view.page().runJavaScript(js)
+        self.push_positions([(lat, lon)])
+
+    def push_positions(self, samples):
+        """ Append (lat, lon) or (lat, lon, t) samples to the track; the page hears about it once per frame """
+        if not samples:
+            return
+        self.lat, self.lon = samples[-1][:2]
+        vertices = self.track.extend(samples)
+        self.track_label.setText(f"{len(self.track)} pts | {self.track.vertices} on map")
+        if self.bridge is not None:
+            self.bridge.push_positions(vertices)
+            self.bridge.set_rover(self.lat, self.lon)
+
+    def clear_track(self):
+        self.track.clear()
+        self.track_label.setText("")
+        if self.bridge is not None:
+            self.bridge.clear_track()
+
+    def export_track(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Track", "rover_track.gpx",
+                                                        "GPX (*.gpx);;CSV (*.csv)")
+        if path:
+            n = self.track.export(path)
+            QtWidgets.QMessageBox.information(self, "Export Track", f"{n} points saved to {path}")
 
     def set_locked(self, locked: bool):
         self.locked = bool(locked)
-        # update marker color immediately
-        self.update_position(self.lat, self.lon)
+        # marker colour changes on the next frame, no position update needed
+        if self.bridge is not None:
+            self.bridge.set_locked(self.locked)
 
 # ----------------------------
 # Video (camera) widget w/ fixed frame and fullscreen
 # ----------------------------
-video_link ="G:/GCS/vid.mp4"
+# Any URI video_source understands: file path, device:N, synthetic:WxH@FPS, http://.../stream.mjpg
+video_link = os.getenv("GCS_VIDEO_SOURCE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "vid.mp4"))
+FRONT_CAM = os.getenv("GCS_FRONT_CAM", video_link)
+REAR_CAM = os.getenv("GCS_REAR_CAM", video_link)
 class CameraWidget(QtWidgets.QWidget):
     def __init__(self, cam_source=video_link, title="Camera", fixed_size=(480,270), parent=None):
         super().__init__(parent)
-        self.cam_source = video_link
+        self.cam_source = cam_source
+        self.title = title
+        self.recorder = None
         self.fixed_w, self.fixed_h = fixed_size
         self.fullscreen_window = None
         print(self.cam_source)
@@ -130,94 +139,141 @@ class CameraWidget(QtWidgets.QWidget):
         lbl.setStyleSheet("font-weight:bold;")
         hdr.addWidget(lbl)
         hdr.addStretch()
+        self.stats_label = QtWidgets.QLabel("")
+        self.stats_label.setStyleSheet("color:#888; font-size:10px;")
+        self.stats_label.setToolTip("Decode time | GUI blit / widget paint time | decoded fps | frames dropped before display")
+        hdr.addWidget(self.stats_label)
+        self.btn_rec = QtWidgets.QPushButton("Rec")
+        self.btn_rec.setCheckable(True)
+        self.btn_rec.setToolTip("Record this camera to disk")
+        self.btn_rec.toggled.connect(self.set_recording)
+        hdr.addWidget(self.btn_rec)
         self.btn_full = QtWidgets.QPushButton("Full")
         self.btn_full.setToolTip("Open fullscreen")
         self.btn_full.clicked.connect(self.open_fullscreen)
         hdr.addWidget(self.btn_full)
         layout.addLayout(hdr)
 
-        self.video_label = QtWidgets.QLabel()
+        self.video_label = create_surface()
         self.video_label.setFixedSize(self.fixed_w, self.fixed_h)
         self.video_label.setStyleSheet("background-color: black; border: 2px solid #444;")
         self.video_label.setAlignment(QtCore.Qt.AlignCenter)
         layout.addWidget(self.video_label, alignment=QtCore.Qt.AlignCenter)
 
-        # Try open camera
-        try:
-            self.cap = cv2.VideoCapture(self.cam_source)
-            if not self.cap.isOpened():
-                raise RuntimeError("Camera not opened")
-            self.using_camera = True
-        except Exception:
-            self.cap = None
-            self.using_camera = False
-            # set placeholder image
-            placeholder = QtGui.QPixmap(self.fixed_w, self.fixed_h)
-            placeholder.fill(QtGui.QColor("#111"))
-            painter = QtGui.QPainter(placeholder)
-            painter.setPen(QtGui.QPen(QtGui.QColor("#aaa")))
-            painter.setFont(QtGui.QFont("Sans", 12))
-            painter.drawText(placeholder.rect(), QtCore.Qt.AlignCenter, "No camera\nsource")
-            painter.end()
-            self.video_label.setPixmap(placeholder)
-
-        # start timer update
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self._update)
-        self.timer.start(30)
+        # Decode happens on the shared capture worker; the GUI thread only blits finished frames
+        self.using_camera = False
+        self._shown_seq = 0
+        self._fs_sub = None
+        self._fs_seq = 0
+        self.dropped = 0
+        self._paint_s = 0.0
+        self._paint_n = 0
+        self.worker, self.sub = video_registry.subscribe(self.cam_source, (self.fixed_w, self.fixed_h),
+                                                         letterbox=True)
+        self.worker.frame_ready.connect(self._update, QtCore.Qt.QueuedConnection)
+        self.worker.stats_updated.connect(self._on_stats, QtCore.Qt.QueuedConnection)
+        if self.worker.is_open is None:
+            self.worker.opened.connect(self._on_opened, QtCore.Qt.QueuedConnection)
+        else:
+            self._on_opened(self.worker.is_open)
 
-    def _update(self):
-        if not self.using_camera or self.cap is None:
-            return
-        ret, frame = self.cap.read()
-        if not ret:
+    def _on_opened(self, ok):
+        self.using_camera = ok
+        if ok:
             return
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w, ch = frame.shape
-        qimg = QtGui.QImage(frame.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
-        pix = QtGui.QPixmap.fromImage(qimg)
-        # scale to fixed size but do not stretch (keep aspect, letterbox)
-        scaled = pix.scaled(self.fixed_w, self.fixed_h, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-        # To maintain fixed frame size, create a black canvas and center scaled image
-        canvas = QtGui.QPixmap(self.fixed_w, self.fixed_h)
-        canvas.fill(QtGui.QColor("black"))
-        painter = QtGui.QPainter(canvas)
-        x = (self.fixed_w - scaled.width()) // 2
-        y = (self.fixed_h - scaled.height()) // 2
-        painter.drawPixmap(x, y, scaled)
+        # set placeholder image
+        placeholder = QtGui.QPixmap(self.fixed_w, self.fixed_h)
+        placeholder.fill(QtGui.QColor("#111"))
+        painter = QtGui.QPainter(placeholder)
+        painter.setPen(QtGui.QPen(QtGui.QColor("#aaa")))
+        painter.setFont(QtGui.QFont("Sans", 12))
+        painter.drawText(placeholder.rect(), QtCore.Qt.AlignCenter, "No camera\nsource")
         painter.end()
-        self.video_label.setPixmap(canvas)
+        self.video_label.setPixmap(placeholder)
+
+    def _update(self):
+        t0 = time.perf_counter()
+        seq = show_latest(self.video_label, self.sub.buffer, self._shown_seq)
+        if seq != self._shown_seq:
+            # every frame published since the last one we showed never reached the screen
+            self.dropped += seq - self._shown_seq - 1 if self._shown_seq else 0
+            self._shown_seq = seq
         # if fullscreen open, update that too
-        if self.fullscreen_window:
-            fs_pix = pix.scaled(self.fullscreen_window.width(), self.fullscreen_window.height(),
-                                QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
-            self.fullscreen_window.setPixmap(fs_pix)
+        if self.fullscreen_window and self._fs_sub is not None:
+            self._fs_seq = show_latest(self.fullscreen_window.surface, self._fs_sub.buffer, self._fs_seq)
+        self._paint_s += time.perf_counter() - t0
+        self._paint_n += 1
+
+    def _on_stats(self, stats):
+        blit_ms = 1000.0 * self._paint_s / self._paint_n if self._paint_n else 0.0
+        self._paint_s, self._paint_n = 0.0, 0
+        self.stats_label.setText(f"{stats['decode_ms']:.1f} ms | blit {blit_ms:.1f} / paint "
+                                 f"{self.video_label.paint_ms:.1f} ms | {stats['fps']:.0f} fps | drop {self.dropped}")
+        if "drift_ms" in stats:
+            # file playback: how far behind the recording's own timeline we are
+            self.stats_label.setToolTip(f"Playback drift {stats['drift_ms']:.1f} ms "
+                                        f"(max {stats['max_drift_ms']:.0f} ms), {stats['skipped']} frames skipped")
+
+    def set_recording(self, on, wait=False):
+        """ wait=True blocks until the file is closed (app exit, the writer would be killed mid-file) """
+        if on and self.recorder is None:
+            self.recorder = VideoRecorder(recording_path(self.title), fps=self.worker.fps or 30.0).start()
+            self.worker.add_tap(self.recorder.submit)
+            self.btn_rec.setStyleSheet("background-color: darkred; color:white;")
+            self.btn_rec.setToolTip(f"Recording to {self.recorder.path}")
+        elif not on and self.recorder is not None:
+            self.worker.remove_tap(self.recorder.submit)
+            self.recorder.stop(wait=wait)  # writer drains the queue in the background
+            self.recorder = None
+            self.btn_rec.setStyleSheet("")
+            self.btn_rec.setToolTip("Record this camera to disk")
 
     def open_fullscreen(self):
         if self.fullscreen_window:
             return
         self.fullscreen_window = FullscreenWindow()
         self.fullscreen_window.closed.connect(self._on_fullscreen_closed)
+        self.fullscreen_window.resized.connect(self._on_fullscreen_resized)
         self.fullscreen_window.showFullScreen()
 
+    def _on_fullscreen_resized(self, w, h):
+        self._release_fullscreen()
+        _, self._fs_sub = video_registry.subscribe(self.cam_source, (w, h), letterbox=True)
+        self._fs_seq = 0
+
+    def _release_fullscreen(self):
+        if self._fs_sub is not None:
+            video_registry.unsubscribe(self.cam_source, self._fs_sub)
+            self._fs_sub = None
+
     def _on_fullscreen_closed(self):
+        self._release_fullscreen()
         self.fullscreen_window = None
 
     def close(self):
-        if self.cap:
-            self.cap.release()
+        self.set_recording(False)
+        self._release_fullscreen()
+        video_registry.unsubscribe(self.cam_source, self.sub)
         super().close()
 
-class FullscreenWindow(QtWidgets.QLabel):
+class FullscreenWindow(QtWidgets.QWidget):
     closed = QtCore.pyqtSignal()
+    resized = QtCore.pyqtSignal(int, int)
     def __init__(self):
         super().__init__()
         self.setStyleSheet("background-color: black;")
-        self.setAlignment(QtCore.Qt.AlignCenter)
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.surface = create_surface()
+        self.surface.setAlignment(QtCore.Qt.AlignCenter)
+        layout.addWidget(self.surface)
     def keyPressEvent(self, ev):
         # allow Esc to close fullscreen
         if ev.key() == QtCore.Qt.Key_Escape:
             self.close()
+    def resizeEvent(self, ev):
+        self.resized.emit(self.width(), self.height())
+        super().resizeEvent(ev)
     def closeEvent(self, ev):
         self.closed.emit()
         ev.accept()
@@ -255,6 +311,7 @@ class TelemetryPanel(QtWidgets.QGroupBox):
         self.small_status.setReadOnly(True)
         self.small_status.setFixedHeight(80)
         self.small_status.setStyleSheet("background:#111; color:#ddd;")
+        self.small_status.document().setMaximumBlockCount(200)  # replay can push thousands of lines
         layout.addWidget(QtWidgets.QLabel("Sensors / Quick Status"), 4, 2)
         layout.addWidget(self.small_status, 5, 2, 1, 2)
 
@@ -339,13 +396,20 @@ class ControlPanel(QtWidgets.QGroupBox):
 # Log / Terminal Widget (neon)
 # ----------------------------
 class LogWidget(QtWidgets.QGroupBox):
+    saved = QtCore.pyqtSignal(str, int, str)  # from the sink thread: directory, files copied, error or ""
+    sink_failed = QtCore.pyqtSignal(str)      # from the sink thread: log files stopped being written
+
     def __init__(self):
         super().__init__("Mission Log")
         layout = QtWidgets.QVBoxLayout()
         self.setLayout(layout)
 
-        self.terminal = QtWidgets.QPlainTextEdit()
-        self.terminal.setReadOnly(True)
+        # ring-buffer backed list: bounded memory, only visible rows are ever painted
+        self.model = LogListModel()
+        self.terminal = QtWidgets.QListView()
+        self.terminal.setModel(self.model)
+        self.terminal.setUniformItemSizes(True)
+        self.terminal.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         # neon terminal styling
         self.terminal.setStyleSheet("""
             background: #000;
@@ -353,6 +417,9 @@ class LogWidget(QtWidgets.QGroupBox):
             font-family: 'Courier New', monospace;
             font-size: 12px;
         """)
+        self._at_bottom = True
+        self.model.rowsAboutToBeInserted.connect(self._check_tail)
+        self.model.rowsInserted.connect(self._follow_tail)
         layout.addWidget(self.terminal)
 
         btn_row = QtWidgets.QHBoxLayout()
@@ -364,25 +431,99 @@ class LogWidget(QtWidgets.QGroupBox):
         btn_row.addWidget(self.btn_reload)
         layout.addLayout(btn_row)
 
+        # everything also streams to rotating files on disk, so nothing is lost to the ring
+        self.sink = LogSink("mission", on_error=self.sink_failed.emit).start()
+        self.saved.connect(self._on_saved)
+        self.sink_failed.connect(lambda err: self.log(f"Log file write failed, lines are being dropped: {err}", "error"))
+
         # signals will be connected from main window
 
-    def log(self, text):
-        ts = time.strftime("%H:%M:%S")
-        self.terminal.appendPlainText(f"[{ts}] {text}")
+    def log(self, text, level="info"):
+        rec = self.model.append(text, level)
+        self.sink.write(f"{rec.format()} {level.upper()}" if level != "info" else rec.format())
+
+    def _check_tail(self):
+        # keep scrolling with new lines unless the user scrolled up to read
+        bar = self.terminal.verticalScrollBar()
+        self._at_bottom = bar.value() >= bar.maximum()
+
+    def _follow_tail(self):
+        if self._at_bottom:
+            self.terminal.scrollToBottom()
 
     def save_log(self, path=None):
+        """ Copy this session's log files (already on disk) into a directory """
         if not path:
-            path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save Log", "mission_log.txt", "Text Files (*.txt)")
+            path = QtWidgets.QFileDialog.getExistingDirectory(self, "Save Log", os.getcwd())
             if not path:
                 return
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(self.terminal.toPlainText())
-        self.log(f"Log saved to {path}")
+        self.sink.save_to(path, lambda d, paths, error: self.saved.emit(d, len(paths), error or ""))
+
+    def _on_saved(self, path, n, error):
+        if error:
+            self.log(f"Log save to {path} failed after {n} files: {error}", "error")
+        else:
+            self.log(f"Log saved to {path} ({n} files)")
 
     def clear(self):
-        self.terminal.clear()
+        self.model.clear()
         self.log("Log cleared")
 
+# ----------------------------
+# Replay toolbar - open a recorded session and scrub through it
+# ----------------------------
+class ReplayBar(QtWidgets.QToolBar):
+    open_requested = QtCore.pyqtSignal()
+    play_toggled = QtCore.pyqtSignal(bool)
+    speed_changed = QtCore.pyqtSignal(float)
+    seek_requested = QtCore.pyqtSignal(float)  # seconds since session start
+    stop_requested = QtCore.pyqtSignal()
+
+    STEPS = 1000  # slider resolution
+
+    def __init__(self, parent=None):
+        super().__init__("Replay", parent)
+        self.duration = 0.0
+
+        self.btn_open = QtWidgets.QPushButton("Open Session")
+        self.btn_play = QtWidgets.QPushButton("Play")
+        self.btn_play.setCheckable(True)
+        self.btn_stop = QtWidgets.QPushButton("Live")
+        self.speed = QtWidgets.QComboBox()
+        self.speed.addItems(list(REPLAY_SPEEDS))
+        self.slider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
+        self.slider.setRange(0, self.STEPS)
+        self.pos_label = QtWidgets.QLabel("live")
+        self.pos_label.setMinimumWidth(120)
+        for w in (self.btn_open, self.btn_play, self.speed, self.slider, self.pos_label, self.btn_stop):
+            self.addWidget(w)
+        self.set_loaded(False)
+
+        self.btn_open.clicked.connect(self.open_requested)
+        self.btn_play.toggled.connect(self._on_play)
+        self.btn_stop.clicked.connect(self.stop_requested)
+        self.speed.currentTextChanged.connect(lambda k: self.speed_changed.emit(REPLAY_SPEEDS[k]))
+        self.slider.sliderReleased.connect(
+            lambda: self.seek_requested.emit(self.slider.value() / self.STEPS * self.duration))
+
+    def _on_play(self, on):
+        self.btn_play.setText("Pause" if on else "Play")
+        self.play_toggled.emit(on)
+
+    def set_loaded(self, loaded, duration=0.0):
+        self.duration = duration
+        for w in (self.btn_play, self.speed, self.slider, self.btn_stop):
+            w.setEnabled(loaded)
+        if not loaded:
+            self.btn_play.setChecked(False)
+            self.slider.setValue(0)
+            self.pos_label.setText("live")
+
+    def set_position(self, seconds):
+        if not self.slider.isSliderDown() and self.duration > 0:
+            self.slider.setValue(int(seconds / self.duration * self.STEPS))
+        self.pos_label.setText(f"{seconds:8.1f} / {self.duration:.1f} s")
+
 # ----------------------------
 # Main Window assembling everything
 # ----------------------------
@@ -415,8 +556,8 @@ class MainWindow(QtWidgets.QMainWindow):
         cams_widget = QtWidgets.QWidget()
         cams_v = QtWidgets.QVBoxLayout(cams_widget)
         cams_v.setContentsMargins(0, 0, 0, 0)
-        self.cam_top = CameraWidget(cam_source=0, title="Front Camera", fixed_size=(560, 320))
-        self.cam_bottom = CameraWidget(cam_source=1, title="Rear Camera", fixed_size=(560, 320))
+        self.cam_top = CameraWidget(cam_source=FRONT_CAM, title="Front Camera", fixed_size=(560, 320))
+        self.cam_bottom = CameraWidget(cam_source=REAR_CAM, title="Rear Camera", fixed_size=(560, 320))
         cams_v.addWidget(self.cam_top)
         cams_v.addWidget(self.cam_bottom)
 
@@ -443,7 +584,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.tabs.addTab(rover_tab, "Ground Control")
 
         # ----------------- Tab 2: Analysis -----------------
-        self.analysis_tab = AnalysisModule()
+        self.analysis_tab = AnalysisModule(simulate=False)  # fed with the rover telemetry below
         self.tabs.addTab(self.analysis_tab, "Telemetry Analysis")
         #--------------------Tab 3: FPV Controlller-----------
         self.tabs.addTab(self.fpv_controller, "FPV Controller")
@@ -483,10 +624,36 @@ class MainWindow(QtWidgets.QMainWindow):
         self._sim_speed = 0.0
         self._sim_temp = 25.0
 
+        # every sample is kept as a binary record, see telemetry_store
+        self.telemetry_rec = TelemetryRecorder(session_path("rover"))
+
+        # consumers read the bus at their own pace; a fast link never means fast repaints
+        self._bus_subs = [
+            telemetry_bus.subscribe(self.telemetry.update, max_hz=10),
+            telemetry_bus.subscribe(self._update_map, max_hz=5, batch=True),
+            telemetry_bus.subscribe(self._ingest_analysis, max_hz=4, batch=True),
+            telemetry_bus.subscribe(self._log_telemetry, max_hz=1),
+        ]
+        # front camera decode rate goes straight to the plots, next to the rover's own fields; not over
+        # the bus, where it would wake the telemetry panel and log with nothing new from the vehicle
+        self.cam_top.worker.stats_updated.connect(self._ingest_camera_stats)
+
         self.sim_timer = QtCore.QTimer()
         self.sim_timer.timeout.connect(self._simulate_telemetry)
         self.sim_timer.start(1500)
 
+        # ----------------- Telemetry Replay -----------------
+        self.replay = None
+        self.replay_bar = ReplayBar(self)
+        self.addToolBar(QtCore.Qt.BottomToolBarArea, self.replay_bar)
+        self.replay_bar.open_requested.connect(self._open_replay)
+        self.replay_bar.play_toggled.connect(self._play_replay)
+        self.replay_bar.speed_changed.connect(lambda x: self.replay and self.replay.set_speed(x))
+        self.replay_bar.seek_requested.connect(lambda sec: self.replay and self.replay.seek(sec))
+        self.replay_bar.stop_requested.connect(self._stop_replay)
+        if os.getenv("GCS_REPLAY"):
+            self._load_replay(os.getenv("GCS_REPLAY"))
+
         # Initial logs
         self.log_widget.log("GCS Started")
         self.log_widget.log("Map & cameras initialized")
@@ -523,6 +690,81 @@ class MainWindow(QtWidgets.QMainWindow):
         self.log_widget.log("Rover reloaded / reset to home position")
         self.map_widget.update_position(self._sim_lat, self._sim_lon)
 
+    # ---------------- telemetry replay ----------------
+    def _open_replay(self):
+        path = QtWidgets.QFileDialog.getExistingDirectory(self, "Open Telemetry Session", TELEMETRY_DIR)
+        if path:
+            self._load_replay(path)
+
+    def _load_replay(self, path):
+        self._stop_replay()
+        try:
+            replay = TelemetryReplay(path, speed=REPLAY_SPEEDS[self.replay_bar.speed.currentText()], parent=self)
+        except (OSError, ValueError) as e:
+            self.log_widget.log(f"Replay: cannot open {path}: {e}", "error")
+            return
+        if not len(replay.session):
+            self.log_widget.log(f"Replay: {path} has no samples", "warn")
+            return
+        # replay takes over the live telemetry path
+        self.sim_timer.stop()
+        self.analysis_tab.reset()
+        self.map_widget.clear_track()
+        self.replay = replay
+        replay.seeked.connect(self._on_replay_seeked)
+        replay.sample.connect(telemetry_bus.publish)
+        replay.position_changed.connect(self.replay_bar.set_position)
+        replay.finished.connect(lambda: self.replay_bar.btn_play.setChecked(False))
+        replay.finished.connect(lambda: self.log_widget.log("Replay finished"))
+        self.replay_bar.set_loaded(True, replay.duration)
+        replay.seek(0.0)
+        self.log_widget.log(f"Replay: {path} ({len(replay.session)} samples, {replay.duration:.1f} s)")
+
+    def _on_replay_seeked(self, seconds):
+        # plots and track must stay in time order: a seek (backwards above all) starts them over
+        telemetry_bus.clear_pending()
+        self.analysis_tab.reset()
+        self.map_widget.clear_track()
+
+    def _play_replay(self, on):
+        if self.replay is None:
+            return
+        if on:
+            self.replay.play()
+        else:
+            self.replay.pause()
+
+    def _stop_replay(self):
+        if self.replay is None:
+            return
+        self.replay.pause()
+        self.replay.deleteLater()
+        self.replay = None
+        self.replay_bar.set_loaded(False)
+        self.analysis_tab.reset()
+        self.map_widget.clear_track()
+        self.sim_timer.start(1500)
+        self.log_widget.log("Replay closed, back to live telemetry")
+
+    # ---------------- telemetry bus consumers ----------------
+    def _update_map(self, samples):
+        now = time.time()
+        # every sample since the last delivery goes on the track, in one page call
+        self.map_widget.push_positions([(s["lat"], s["lon"], s.get("t", now)) for s in samples
+                                        if "lat" in s and "lon" in s])
+
+    def _ingest_analysis(self, samples):
+        self.analysis_tab.ingest_many(samples)
+
+    def _ingest_camera_stats(self, stats):
+        # stamped with wall-clock time: only meaningful next to live telemetry, not a replayed session's clock
+        if self.replay is None:
+            self.analysis_tab.ingest_many([{"decode_fps": stats["fps"]}])
+
+    def _log_telemetry(self, telemetry):
+        self.log_widget.log(f"Telemetry update | Bat:{telemetry.get('battery', 0):.1f}% "
+                            f"Speed:{telemetry.get('speed', 0):.2f}m/s Dist:{telemetry.get('distance', 0):.1f}m")
+
     # ---------------- telemetry simulation ----------------
     def _simulate_telemetry(self):
         step = (self.controls.speed_slider.value() / 255.0) * 0.0004
@@ -539,17 +781,28 @@ class MainWindow(QtWidgets.QMainWindow):
             "distance": round(self._sim_distance, 1),
             "lat": self._sim_lat,
             "lon": self._sim_lon,
-            "temp": round(self._sim_temp, 1)
+            "temp": round(self._sim_temp, 1),
+            # actuator positions as the rover reports them back
+            "servo": self.controls.servo_dial.value(),
+            "pan": self.controls.pan_slider.value(),
+            "tilt": self.controls.tilt_slider.value(),
         }
-        self.telemetry.update(telemetry)
-        self.map_widget.update_position(self._sim_lat, self._sim_lon)
-        self.log_widget.log(f"Telemetry update | Bat:{telemetry['battery']}% Speed:{telemetry['speed']}m/s Dist:{telemetry['distance']}m")
+        self.telemetry_rec.record(telemetry)
+        telemetry_bus.publish(telemetry)
 
     def closeEvent(self, ev):
-        try: self.cam_top.cap.release()
-        except Exception: pass
-        try: self.cam_bottom.cap.release()
+        # finish every recording before the interpreter exits, or the MP4s are left without an index
+        for cam in (self.cam_top, self.cam_bottom):
+            cam.set_recording(False, wait=True)
+        self.fpv_controller.stop_recording(wait=True)
+        for sub in self._bus_subs:
+            telemetry_bus.unsubscribe(sub)
+        self.telemetry_rec.close()
+        self.log_widget.sink.stop()
+        self.fpv_controller.sink.stop()
+        try: video_registry.stop_all()
         except Exception: pass
+        tile_server.stop()  # commits the tile cache's pending LRU updates
         ev.accept()
 
 
@@ -557,6 +810,11 @@ class MainWindow(QtWidgets.QMainWindow):
 # Run the app
 # ----------------------------
 def main():
+    if VIDEO_SURFACE == "gl":
+        # QOpenGLWidget next to QtWebEngine needs shared contexts, set before the app exists
+        QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    if WEBENGINE_AVAILABLE:
+        configure_map_engine()  # Chromium flags are only read when the web engine starts
     app = QtWidgets.QApplication(sys.argv)
     win = MainWindow()
     win.show()
@@ -1,10 +1,20 @@
-import cv2
-import random
-import threading
-from PyQt5 import QtCore, QtWidgets, QtGui
+import os
+import time
+from PyQt5 import QtCore, QtWidgets
+from video_worker import registry as video_registry
+from video_surface import create_surface, show_latest
+from video_recorder import VideoRecorder, recording_path
+from log_sink import LogSink
+from telemetry_bus import bus as telemetry_bus
+
+FPV_SOURCE = os.getenv("GCS_FPV_CAM", "device:0")
+FPV_FRAME_SIZE = (640, 360)
 
 
 class FPVController(QtWidgets.QWidget):
+    logs_saved = QtCore.pyqtSignal(str, int, str)  # from the sink thread: directory, files copied, error or ""
+    sink_failed = QtCore.pyqtSignal(str)           # from the sink thread: log files stopped being written
+
     def __init__(self, parent=None):
         super().__init__(parent)
 
@@ -21,7 +31,7 @@ class FPVController(QtWidgets.QWidget):
         upper_layout = QtWidgets.QHBoxLayout(upper_widget)
 
         # Left: Video Stream
-        self.video_label = QtWidgets.QLabel("Video Stream")
+        self.video_label = create_surface("Video Stream")
         self.video_label.setAlignment(QtCore.Qt.AlignCenter)
         self.video_label.setStyleSheet("background-color: black; color: lime; font-size: 16px;")
         upper_layout.addWidget(self.video_label, 2)
@@ -72,8 +82,11 @@ class FPVController(QtWidgets.QWidget):
         action_layout = QtWidgets.QHBoxLayout()
         self.lock_btn = QtWidgets.QPushButton("Lock Target")
         self.shoot_btn = QtWidgets.QPushButton("Shoot")
+        self.record_btn = QtWidgets.QPushButton("Record")
+        self.record_btn.setCheckable(True)
         action_layout.addWidget(self.lock_btn)
         action_layout.addWidget(self.shoot_btn)
+        action_layout.addWidget(self.record_btn)
         right_panel.addLayout(action_layout)
 
         upper_layout.addLayout(right_panel, 2)
@@ -103,13 +116,22 @@ class FPVController(QtWidgets.QWidget):
         self.splitter.addWidget(lower_widget)
 
         # -------- Internal States --------
-        self.cap = None
-        self._video_thread = None
         self._running = False
 
-        # -------- Telemetry simulation --------
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self._simulate_telemetry)
+        # frames come from the shared capture of FPV_SOURCE; the GUI reads the newest at display rate
+        self._worker = None
+        self._sub = None
+        self._shown_seq = 0
+        self.recorder = None
+        self.sink = LogSink("fpv", on_error=self.sink_failed.emit).start()
+        self.sink_failed.connect(lambda err: self._log(f"[SYSTEM] Log file write failed, lines are being dropped: {err}"))
+        self.logs_saved.connect(lambda d, n, err: self._log(f"[SYSTEM] Log save to {d} failed after {n} files: {err}"
+                                                            if err else f"[SYSTEM] Logs saved to {d} ({n} files)"))
+        self.display_timer = QtCore.QTimer()
+        self.display_timer.timeout.connect(self._show_frame)
+
+        # -------- Telemetry (from the shared bus while the tab is active) --------
+        self._bus_sub = None
 
         # -------- Connect button actions --------
         self.btn_forward.clicked.connect(lambda: self._log("[CMD] Forward"))
@@ -121,68 +143,85 @@ class FPVController(QtWidgets.QWidget):
         self.shoot_btn.clicked.connect(lambda: self._log("[ACTION] Shoot Activated"))
         self.clear_log_btn.clicked.connect(lambda: self.log_area.clear())
         self.save_log_btn.clicked.connect(self._save_logs)
+        self.record_btn.toggled.connect(self._toggle_recording)
         self.reload_btn.clicked.connect(lambda: self._log("[SYSTEM] Rover Reloaded"))
 
     # ---------------- FPV activate ----------------
     def activate(self):
         if not self._running:
             self._running = True
-            self.timer.start(1000)  # telemetry update
-            self._start_video_thread()
+            self._bus_sub = telemetry_bus.subscribe(self._on_telemetry, max_hz=1)
+            self._start_video()
+            self.display_timer.start(33)
             self._log(">>> FPV Controller Activated <<<")
 
     def deactivate(self):
         """Stop FPV when leaving tab"""
         self._running = False
-        self.timer.stop()
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        if self._bus_sub is not None:
+            telemetry_bus.unsubscribe(self._bus_sub)
+            self._bus_sub = None
+        self.display_timer.stop()
+        self.record_btn.setChecked(False)
+        if self._sub is not None:
+            video_registry.unsubscribe(FPV_SOURCE, self._sub)
+            self._worker = self._sub = None
         self.video_label.setText("Video Stream")
         self._log(">>> FPV Controller Deactivated <<<")
 
-    # ---------------- Video thread ----------------
-    def _start_video_thread(self):
-        if self.cap is None:
-            self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)  # safer on Windows
-
-        def run():
-            while self._running and self.cap.isOpened():
-                ret, frame = self.cap.read()
-                if not ret:
-                    continue
-                frame = cv2.resize(frame, (640, 360))
-                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                h, w, ch = rgb.shape
-                qimg = QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
-                pixmap = QtGui.QPixmap.fromImage(qimg)
-                self.video_label.setPixmap(pixmap)
-
-        self._video_thread = threading.Thread(target=run, daemon=True)
-        self._video_thread.start()
-
-    # ---------------- Fake Telemetry ----------------
-    def _simulate_telemetry(self):
-        battery = random.uniform(50, 100)
-        speed = self.speed_slider.value() / 10.0
+    # ---------------- Video ----------------
+    def _start_video(self):
+        # decode runs on the shared capture worker, so Multi-View can show the same camera
+        self._worker, self._sub = video_registry.subscribe(FPV_SOURCE, FPV_FRAME_SIZE)
+        self._shown_seq = 0
+
+    def _show_frame(self):
+        self._shown_seq = show_latest(self.video_label, self._sub.buffer, self._shown_seq)
+
+    # ---------------- Recording ----------------
+    def _toggle_recording(self, on):
+        if on and self.recorder is None:
+            if self._worker is None:
+                self.record_btn.setChecked(False)
+                self._log("[REC] Activate the FPV tab to record")
+                return
+            self.recorder = VideoRecorder(recording_path("fpv"), fps=self._worker.fps or 30.0).start()
+            self._worker.add_tap(self.recorder.submit)
+            self._log(f"[REC] Recording to {self.recorder.path}")
+        elif not on:
+            self.stop_recording()
+
+    def stop_recording(self, wait=False):
+        """ wait=True blocks until the file is closed (app exit) """
+        if self.recorder is None:
+            return
+        if self._worker is not None:
+            self._worker.remove_tap(self.recorder.submit)
+        self.recorder.stop(wait=wait)  # writer drains the queue in the background
+        stats = self.recorder.stats()
+        self._log(f"[REC] Stopped: {stats['written'] + stats['queued']} frames, {stats['dropped']} dropped")
+        self.recorder = None
+        self.record_btn.setChecked(False)
+
+    # ---------------- Telemetry ----------------
+    def _on_telemetry(self, telemetry):
         servo = self.servo_slider.value()
-        altitude = random.uniform(5, 15)
-        distance = random.uniform(100, 500)
-
+        alt = f" | Alt:{telemetry['alt']:.1f} m" if "alt" in telemetry else ""
         self._log(
-            f"[Telemetry] Bat:{battery:.1f}% | Speed:{speed:.1f} m/s | Servo:{servo}° | Alt:{altitude:.1f} m | Dist:{distance:.1f} m"
+            f"[Telemetry] Bat:{telemetry.get('battery', 0):.1f}% | Speed:{telemetry.get('speed', 0):.1f} m/s | "
+            f"Servo:{servo}°{alt} | Dist:{telemetry.get('distance', 0):.1f} m"
         )
 
     # ---------------- Logger ----------------
     def _log(self, text):
         self.log_area.append(f"<span style='color:#39ff14;'>{text}</span>")
         self.telemetry_text.append(f"<span style='color:cyan;'>{text}</span>")
+        self.sink.write(f"[{time.strftime('%H:%M:%S')}] {text}")
 
     # ---------------- Save Logs ----------------
     def _save_logs(self):
-        with open("fpv_logs.txt", "w") as f:
-            f.write(self.log_area.toPlainText())
-        self._log("[SYSTEM] Logs saved to fpv_logs.txt")
+        # the sink thread finishes the open file and copies the session's files
+        self.sink.save_to("fpv_logs", lambda d, paths, error: self.logs_saved.emit(d, len(paths), error or ""))
 
     # ---------------- Cleanup ----------------
     def closeEvent(self, ev):
@@ -0,0 +1,72 @@
+# bench_analysis_plot.py
+"""
+Frames per second of the Analysis tab redraw, full vs blit, with large windows.
+
+Each frame appends a few new samples (as a live link would) and redraws.
+
+Run:
+ python bench_analysis_plot.py                      # 1e5 and 1e6 points
+ python bench_analysis_plot.py --points 200000 --frames 50
+ python bench_analysis_plot.py --downsample none lttb minmax
+"""
+
+import sys
+import time
+import argparse
+import numpy as np
+
+from PyQt5 import QtWidgets
+from Analiysis import AnalysisModule
+from downsample import DOWNSAMPLE
+
+
+def rows(view, t, battery, speed, temp):
+    """ store rows for the three default channels, every other registered metric left nan """
+    pad = np.full((len(t), len(view.data.names) - 3), np.nan)
+    return np.column_stack((t, battery, speed, temp, pad))
+
+
+def run(app, mode, points, frames, per_frame, method):
+    view = AnalysisModule(simulate=False, window=points, render_mode=mode, downsample_method=method)
+    view.redraw_timer.stop()
+    view.resize(800, 900)
+    view.show()
+    app.processEvents()
+
+    t = np.arange(points) * 0.1
+    view.data.extend(rows(view, t, 100 - t * 1e-4, 1.5 + 0.5 * np.sin(t / 30.0), 20 + np.random.randn(points) * 0.5))
+    view.plot()  # first draw sets limits and caches backgrounds
+    app.processEvents()
+
+    now = t[-1]
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        new_t = now + np.arange(1, per_frame + 1) * 0.1
+        now = new_t[-1]
+        view.data.extend(rows(view, new_t, 100 - new_t * 1e-4, np.full(per_frame, 1.5), np.full(per_frame, 20.0)))
+        view.plot()
+        app.processEvents()  # let Qt paint what was blitted
+    dt = time.perf_counter() - t0
+    view.close()
+    return frames / dt
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--points", type=int, nargs="+", default=[100_000, 1_000_000])
+    ap.add_argument("--frames", type=int, default=30)
+    ap.add_argument("--per-frame", type=int, default=10, help="samples appended between frames")
+    ap.add_argument("--downsample", nargs="+", default=[DOWNSAMPLE], choices=["none", "minmax", "lttb"])
+    args = ap.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    print(f"{'points':>9} {'downsample':>10} {'full fps':>9} {'blit fps':>9}")
+    for points in args.points:
+        for method in args.downsample:
+            full = run(app, "full", points, args.frames, args.per_frame, method)
+            blit = run(app, "blit", points, args.frames, args.per_frame, method)
+            print(f"{points:>9} {method:>10} {full:>9.1f} {blit:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
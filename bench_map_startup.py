@@ -0,0 +1,192 @@
+# bench_map_startup.py
+"""
+Time to first map paint: the lean map template against folium's page.
+
+For each template a fresh QWebEngineView loads the page (assets and tiles through the
+local tile server, see tile_server) and the page itself reports when every visible
+tile is in (gcs.firstPaintMs). The first load of a run also pays for starting
+Chromium, so it is reported on its own.
+
+--views N opens N map views at once instead, the way the app does (rover map,
+multi-view, mission planner), and reports the time until all of them painted plus the
+resident memory of the web engine processes. "shared" goes through map_service (one
+profile, one renderer), "separate" gives every view its own default page and renderer.
+Chromium flags are per process, so run each mode on its own.
+
+Run:
+ python bench_map_startup.py                    # both templates, 5 loads each
+ python bench_map_startup.py --runs 10 --offline
+ python bench_map_startup.py --static           # page size and requests only, no WebEngine needed
+ python bench_map_startup.py --views 3 --mode shared
+ python bench_map_startup.py --views 3 --mode separate
+"""
+
+import os
+import re
+import sys
+import time
+import tempfile
+import argparse
+import statistics
+
+from PyQt5 import QtCore, QtWidgets
+
+from map_page import render_map_page
+from tile_server import server as tile_server
+
+TEMPLATES = ("folium", "lean")
+
+
+def page_stats(html):
+    """ bytes of the page and the external scripts / stylesheets it pulls in """
+    refs = re.findall(r"<(?:script[^>]+src|link[^>]+href)=[\"']([^\"']+)", html)
+    return len(html.encode()), refs
+
+
+def first_paint(app, path, timeout_s):
+    """ (loadFinished s, first paint s) after view.load(), None where it did not happen in time """
+    from PyQt5 import QtWebEngineWidgets
+    view = QtWebEngineWidgets.QWebEngineView()
+    view.resize(800, 600)
+    view.show()
+    result = {}
+    t0 = time.perf_counter()
+    view.loadFinished.connect(lambda ok: result.setdefault("load", time.perf_counter() - t0))
+
+    def on_value(v):
+        if v is not None:
+            result.setdefault("paint", time.perf_counter() - t0)
+
+    poll = QtCore.QTimer()
+    poll.timeout.connect(lambda: view.page().runJavaScript("window.gcs ? gcs.firstPaintMs : null", on_value))
+    poll.start(5)
+    view.load(QtCore.QUrl.fromLocalFile(os.path.abspath(path)))
+    while "paint" not in result and time.perf_counter() - t0 < timeout_s:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    poll.stop()
+    view.close()
+    view.deleteLater()
+    return result.get("load"), result.get("paint")
+
+
+def engine_processes():
+    """ (count, RSS MB) of the QtWebEngine helper processes below this one (Linux /proc) """
+    children, rss = {}, {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                status = dict(line.split(":", 1) for line in f if ":" in line)
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmd = f.read()
+        except OSError:
+            continue
+        children.setdefault(int(status["PPid"]), []).append(int(pid))
+        if b"QtWebEngineProcess" in cmd:
+            rss[int(pid)] = int(status.get("VmRSS", "0 kB").split()[0]) / 1024.0
+    found, todo = [], [os.getpid()]
+    while todo:
+        for child in children.get(todo.pop(), ()):
+            todo.append(child)
+            if child in rss:
+                found.append(child)
+    return len(found), sum(rss[p] for p in found)
+
+
+def open_views(app, n, mode, html, timeout_s):
+    """ Seconds until n views opened together have all painted (None on timeout) """
+    from PyQt5 import QtWebEngineWidgets
+    from map_service import service as map_service
+    views, painted = [], set()
+    t0 = time.perf_counter()
+    for i in range(n):
+        if mode == "shared":
+            view = map_service.create_view()
+            url = map_service.page_url(f"bench{i}.html", html)
+        else:
+            view = QtWebEngineWidgets.QWebEngineView()
+            path = os.path.join(tempfile.mkdtemp(), "map.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(html)
+            url = QtCore.QUrl.fromLocalFile(path)
+        view.resize(640, 480)
+        view.show()
+        view.load(url)
+        views.append(view)
+
+    def poll():
+        for i, view in enumerate(views):
+            if i not in painted:
+                view.page().runJavaScript("window.gcs ? gcs.firstPaintMs : null",
+                                          lambda v, i=i: v is not None and painted.add(i))
+
+    timer = QtCore.QTimer()
+    timer.timeout.connect(poll)
+    timer.start(5)
+    while len(painted) < n and time.perf_counter() - t0 < timeout_s:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 5)
+    timer.stop()
+    dt = time.perf_counter() - t0 if len(painted) == n else None
+    procs, rss = engine_processes()
+    for view in views:
+        view.close()
+        view.deleteLater()
+    return dt, procs, rss
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--timeout", type=float, default=20.0, help="seconds to wait for one page")
+    ap.add_argument("--offline", action="store_true", help="tile server never touches the network")
+    ap.add_argument("--static", action="store_true", help="only page size and external requests")
+    ap.add_argument("--templates", nargs="+", default=list(TEMPLATES), choices=TEMPLATES)
+    ap.add_argument("--views", type=int, default=0, help="open this many views at once (lean template)")
+    ap.add_argument("--mode", default="shared", choices=["shared", "separate"])
+    args = ap.parse_args()
+    tile_server.offline = args.offline
+
+    pages = {}
+    tmp = tempfile.mkdtemp()
+    for name in args.templates:
+        t0 = time.perf_counter()
+        html = render_map_page(28.6139, 77.2090, zoom=16, template=name)
+        render_ms = (time.perf_counter() - t0) * 1000.0
+        size, refs = page_stats(html)
+        pages[name] = os.path.join(tmp, f"{name}.html")
+        with open(pages[name], "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"{name:>7}: {size / 1024:.1f} kB page, {len(refs)} scripts/stylesheets, rendered in {render_ms:.1f} ms")
+        for ref in refs:
+            print(f"           {ref}")
+    if args.static:
+        return
+
+    if args.views:
+        if args.mode == "shared":
+            from map_service import configure
+            configure()
+        from PyQt5 import QtWebEngineWidgets  # noqa: F401
+        app = QtWidgets.QApplication(sys.argv)
+        with open(pages.get("lean") or next(iter(pages.values())), encoding="utf-8") as f:
+            html = f.read()
+        for run in range(args.runs):
+            dt, procs, rss = open_views(app, args.views, args.mode, html, args.timeout)
+            shown = f"{dt * 1000.0:.0f} ms" if dt is not None else "timeout"
+            print(f"{args.mode}: {args.views} views painted in {shown}, "
+                  f"{procs} web engine processes, {rss:.0f} MB resident")
+        return
+
+    from PyQt5 import QtWebEngineWidgets  # noqa: F401  (must be imported before the QApplication exists)
+    app = QtWidgets.QApplication(sys.argv)
+    print(f"\n{'template':>8} {'first load':>11} {'first paint':>12} {'median load':>12} {'median paint':>13}")
+    for name, path in pages.items():
+        runs = [first_paint(app, path, args.timeout) for _ in range(args.runs)]
+        loads = [r[0] * 1000.0 for r in runs[1:] if r[0] is not None]
+        paints = [r[1] * 1000.0 for r in runs[1:] if r[1] is not None]
+        fmt = lambda v: f"{v * 1000.0:.0f} ms" if v is not None else "timeout"
+        med = lambda xs: f"{statistics.median(xs):.0f} ms" if xs else "-"
+        print(f"{name:>8} {fmt(runs[0][0]):>11} {fmt(runs[0][1]):>12} {med(loads):>12} {med(paints):>13}")
+
+
+if __name__ == "__main__":
+    main()
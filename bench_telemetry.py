@@ -0,0 +1,85 @@
+# bench_telemetry.py
+"""
+Throughput of the binary telemetry recorder and memory-mapped reader, next to the
+text log lines the GCS used to be the only record of.
+
+Run:
+ python bench_telemetry.py                   # 1e6 samples
+ python bench_telemetry.py --samples 5000000 --chunk 1000000
+"""
+
+import os
+import re
+import time
+import shutil
+import tempfile
+import argparse
+import numpy as np
+
+from telemetry_store import TELEMETRY_DTYPE, TelemetryRecorder, TelemetrySession
+
+
+def fake_samples(n):
+    rec = np.zeros(n, dtype=TELEMETRY_DTYPE)
+    rec["t"] = 1.7e9 + np.arange(n) * 0.01  # 100 Hz
+    rec["battery"] = np.linspace(100, 20, n)
+    rec["speed"] = 1.0 + 0.5 * np.sin(np.arange(n) / 500.0)
+    rec["distance"] = np.cumsum(rec["speed"]) * 0.01
+    rec["lat"] = 28.6139 + np.cumsum(np.random.randn(n)) * 1e-7
+    rec["lon"] = 77.2090 + np.cumsum(np.random.randn(n)) * 1e-7
+    rec["temp"] = 20 + np.random.randn(n) * 0.5
+    return rec
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--samples", type=int, default=1_000_000)
+    ap.add_argument("--chunk", type=int, default=1 << 20, help="records per chunk file")
+    ap.add_argument("--per-sample", type=int, default=200_000, help="samples written one dict at a time")
+    args = ap.parse_args()
+
+    n = args.samples
+    data = fake_samples(n)
+    tmp = tempfile.mkdtemp(prefix="gcs_tlm_")
+    mb = n * TELEMETRY_DTYPE.itemsize / 1e6
+    print(f"{n} samples, {TELEMETRY_DTYPE.itemsize} bytes each ({mb:.1f} MB)")
+    try:
+        # live path: one dict per sample, as MainWindow records it
+        k = min(args.per_sample, n)
+        dicts = [dict(zip(TELEMETRY_DTYPE.names[1:], (float(v) for v in tuple(r)[1:]))) for r in data[:k]]
+        rec = TelemetryRecorder(os.path.join(tmp, "live"), chunk_records=args.chunk)
+        dt, _ = timed(lambda: [rec.record(d, t) for d, t in zip(dicts, data["t"][:k])] and rec.close())
+        print(f"record(dict)   {k / dt / 1e3:10.1f} k samples/s  ({dt / k * 1e6:.2f} us/sample)")
+
+        # bulk path: replay import, simulators
+        rec = TelemetryRecorder(os.path.join(tmp, "bulk"), chunk_records=args.chunk)
+        dt, _ = timed(lambda: (rec.extend(data), rec.close()))
+        print(f"extend(array)  {n / dt / 1e6:10.2f} M samples/s  ({mb / dt:.0f} MB/s)")
+
+        dt, session = timed(lambda: TelemetrySession(os.path.join(tmp, "bulk")))
+        print(f"open session   {dt * 1000:10.2f} ms  ({len(session.chunks)} chunks)")
+        dt, mean = timed(lambda: float(session.column("speed").mean()))
+        print(f"mean(speed)    {dt * 1000:10.2f} ms")
+        dt, _ = timed(lambda: [session.index_at(t) for t in np.random.uniform(data["t"][0], data["t"][-1], 1000)])
+        print(f"index_at(t)    {dt / 1000 * 1e6:10.2f} us/lookup")
+        assert np.array_equal(session.read(), data)
+
+        # what it took before: parse the log line back out of text
+        k = min(n, 200_000)
+        lines = [f"[12:00:00] Telemetry update | Bat:{b:.1f}% Speed:{s:.2f}m/s Dist:{d:.1f}m"
+                 for b, s, d in zip(data["battery"][:k], data["speed"][:k], data["distance"][:k])]
+        pat = re.compile(r"Speed:([\d.]+)m/s")
+        dt, _ = timed(lambda: np.array([float(pat.search(line).group(1)) for line in lines]).mean())
+        print(f"text parse     {dt / k * n * 1000:10.2f} ms for mean(speed) over {n} lines (extrapolated)")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench_video_decode.py
+"""
+Compare GUI-thread frame latency for in-process vs multiprocess video decode.
+
+Latency is measured from the moment a frame finished decoding to the moment the
+GUI thread has it as a QPixmap, which is what a view would blit.
+
+Run:
+ python bench_video_decode.py                      # 2 streams of vid.mp4, 10 s per mode
+ python bench_video_decode.py --streams 4 --gui-load 8
+ python bench_video_decode.py --source synthetic:1920x1080@60
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+from video_worker import CaptureWorker
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_mode(app, use_process, args):
+    workers, latencies, shown = [], [], []
+    for i in range(args.streams):
+        worker = CaptureWorker(args.source, use_process=use_process)
+        sub = worker.acquire((args.width, args.height), letterbox=True)
+        state = {"seq": 0}
+        latencies.append([])
+        shown.append(0)
+
+        def on_frame(i=i, sub=sub, state=state):
+            latest = sub.buffer.latest(state["seq"])
+            if latest is None:
+                return
+            seq, stamp, rgb = latest
+            h, w, ch = rgb.shape
+            QtGui.QPixmap.fromImage(QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888))
+            state["seq"] = seq
+            latencies[i].append(time.monotonic() - stamp)
+            shown[i] += 1
+
+        worker.frame_ready.connect(on_frame, QtCore.Qt.QueuedConnection)
+        workers.append(worker)
+
+    # stand-in for map / plot painting competing for the GUI thread and the GIL
+    load_timer = QtCore.QTimer()
+    if args.gui_load > 0:
+        def busy():
+            end = time.perf_counter() + args.gui_load / 1000.0
+            x = 0
+            while time.perf_counter() < end:
+                x += 1
+        load_timer.timeout.connect(busy)
+        load_timer.start(16)
+
+    for worker in workers:
+        worker.start()
+    QtCore.QTimer.singleShot(int(args.duration * 1000), app.quit)
+    app.exec_()
+    load_timer.stop()
+    for worker in workers:
+        worker.stop()
+
+    lat = np.array([x for per in latencies for x in per]) * 1000.0
+    if not len(lat):
+        return None
+    return {
+        "frames": int(sum(shown)),
+        "fps_per_stream": sum(shown) / args.streams / args.duration,
+        "mean_ms": lat.mean(),
+        "p50_ms": np.percentile(lat, 50),
+        "p95_ms": np.percentile(lat, 95),
+        "max_ms": lat.max(),
+        "decode_ms": np.mean([w.decode_ms for w in workers]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--source", default=os.path.join(HERE, "vid.mp4"),
+                    help="video_source URI, e.g. synthetic:1920x1080@60 or vid.mp4?realtime=0")
+    ap.add_argument("--streams", type=int, default=2)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    ap.add_argument("--width", type=int, default=560)
+    ap.add_argument("--height", type=int, default=320)
+    ap.add_argument("--gui-load", type=float, default=4.0, help="ms of busy work on the GUI thread every 16 ms")
+    args = ap.parse_args()
+
+    app = QtWidgets.QApplication(sys.argv)
+    print(f"source={args.source} streams={args.streams} duration={args.duration}s gui_load={args.gui_load}ms")
+    print(f"{'mode':<8} {'frames':>7} {'fps/str':>8} {'mean':>7} {'p50':>7} {'p95':>7} {'max':>7} {'decode':>7}")
+    for name, use_process in (("thread", False), ("process", True)):
+        r = run_mode(app, use_process, args)
+        if r is None:
+            print(f"{name:<8} no frames (could not open source?)")
+            continue
+        print(f"{name:<8} {r['frames']:>7} {r['fps_per_stream']:>8.1f} {r['mean_ms']:>7.2f} {r['p50_ms']:>7.2f} "
+              f"{r['p95_ms']:>7.2f} {r['max_ms']:>7.2f} {r['decode_ms']:>7.2f}")
+    print("latency columns in ms, decode->GUI pixmap")
+
+
+if __name__ == "__main__":
+    main()
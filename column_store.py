@@ -0,0 +1,147 @@
+# column_store.py
+import os
+import warnings
+import numpy as np
+
+ANALYSIS_WINDOW = int(os.getenv("GCS_ANALYSIS_WINDOW", "3600"))      # raw samples kept
+ANALYSIS_BUCKET = int(os.getenv("GCS_ANALYSIS_BUCKET", "60"))        # raw samples per long-term bucket
+ANALYSIS_HISTORY = int(os.getenv("GCS_ANALYSIS_HISTORY", "20000"))   # long-term buckets kept
+
+
+class _Ring:
+    """ Rows of a 2-D array as a ring whose live part is always one contiguous slice.
+
+    Every row is written twice, at i and i + capacity, so the newest `capacity` rows
+    are buf[start:start + capacity] with no wrap-around and no copy when read.
+    """
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.buf = np.zeros((2 * capacity, width))
+        self.total = 0
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def extend(self, rows):
+        cap = self.capacity
+        if len(rows) > cap:
+            self.total += len(rows) - cap  # older rows would be overwritten anyway
+            rows = rows[-cap:]
+        pos = self.total % cap
+        first = min(len(rows), cap - pos)
+        for base in (0, cap):
+            self.buf[base + pos:base + pos + first] = rows[:first]
+            self.buf[base:base + len(rows) - first] = rows[first:]
+        self.total += len(rows)
+
+    def view(self):
+        """ Oldest first, read-only view into the ring """
+        n = len(self)
+        start = (self.total - n) % self.capacity
+        v = self.buf[start:start + n]
+        v.flags.writeable = False
+        return v
+
+    def insert_columns(self, positions):
+        """ New nan columns before each of positions (len(positions) may be the width: append) """
+        self.buf = np.insert(self.buf, positions, np.nan, axis=1)
+
+    def clear(self):
+        self.total = 0
+
+
+class ColumnStore:
+    """ Bounded storage for plotted telemetry: a raw window plus a min/max long-term tier.
+
+    Column 0 is time. The raw tier keeps the newest `window` samples. Every `bucket`
+    samples are also folded into one long-term row (t_first, t_last, min and max of each
+    column), of which the newest `history` are kept. Memory is fixed at construction
+    and plotting cost depends on those sizes, not on how long the mission has run.
+    """
+
+    def __init__(self, names, window=ANALYSIS_WINDOW, bucket=ANALYSIS_BUCKET, history=ANALYSIS_HISTORY):
+        self.names = tuple(names)
+        self.bucket = bucket
+        k = len(self.names)
+        self._raw = _Ring(window, 1 + k)
+        self._hist = _Ring(history, 2 + 2 * k)  # t_first, t_last, mins..., maxs...
+        self._part = np.empty((bucket, 1 + k))  # samples of the bucket being filled
+        self._part_n = 0
+
+    def __len__(self):
+        return self._raw.total
+
+    @property
+    def window(self):
+        return self._raw.capacity
+
+    def add_column(self, name):
+        """ One more column, nan for everything already stored. Copies the buffers once. """
+        if name in self.names:
+            return
+        k = len(self.names)
+        self.names += (name,)
+        self._raw.insert_columns([1 + k])
+        self._hist.insert_columns([2 + k, 2 + 2 * k])  # end of the mins, end of the maxs
+        self._part = np.insert(self._part, [1 + k], np.nan, axis=1)
+
+    def append(self, t, values):
+        """ values: dict by column name (missing = nan) or a sequence in column order """
+        row = np.empty((1, 1 + len(self.names)))
+        row[0, 0] = t
+        if isinstance(values, dict):
+            row[0, 1:] = [values.get(name, np.nan) for name in self.names]
+        else:
+            row[0, 1:] = values
+        self.extend(row)
+
+    def extend(self, rows):
+        """ rows: (n, 1 + columns) array, time first """
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, 1 + len(self.names))
+        if not len(rows):
+            return
+        self._raw.extend(rows)
+
+        # top up the partial bucket, then fold every complete bucket in one vectorized step
+        take = min(self.bucket - self._part_n, len(rows))
+        self._part[self._part_n:self._part_n + take] = rows[:take]
+        self._part_n += take
+        if self._part_n == self.bucket:
+            self._hist.extend(self._fold(self._part[None]))
+            self._part_n = 0
+        rest = rows[take:]
+        whole = len(rest) // self.bucket * self.bucket
+        if whole:
+            self._hist.extend(self._fold(rest[:whole].reshape(-1, self.bucket, rest.shape[1])))
+        tail = rest[whole:]
+        self._part[:len(tail)] = tail
+        self._part_n += len(tail)
+
+    @staticmethod
+    def _fold(buckets):
+        # buckets: (m, bucket, 1 + k) -> (m, 2 + 2k)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # a field never sent in this bucket stays nan
+            return np.concatenate([buckets[:, 0, :1], buckets[:, -1, :1],
+                                   np.nanmin(buckets[:, :, 1:], axis=1), np.nanmax(buckets[:, :, 1:], axis=1)],
+                                  axis=1)
+
+    # ---------------- Readers ----------------
+    def times(self):
+        return self._raw.view()[:, 0]
+
+    def column(self, name):
+        """ Raw window of one column, oldest first (a view, no copy) """
+        return self._raw.view()[:, 1 + self.names.index(name)]
+
+    def history(self, name):
+        """ (t_first, t_last, min, max) arrays of the long-term tier for one column """
+        h = self._hist.view()
+        i, k = self.names.index(name), len(self.names)
+        return h[:, 0], h[:, 1], h[:, 2 + i], h[:, 2 + k + i]
+
+    def clear(self):
+        self._raw.clear()
+        self._hist.clear()
+        self._part_n = 0
@@ -0,0 +1,103 @@
+# downsample.py
+"""
+Cut long series down to roughly one point per pixel before plotting.
+
+  minmax  keeps the lowest and highest sample of every bucket: spikes survive, 2 points per bucket
+  lttb    Largest-Triangle-Three-Buckets: keeps the visually most significant point per bucket
+
+Both work on index buckets (telemetry is close to evenly sampled) and are vectorized
+over the samples; LTTB only loops over buckets, never over samples.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+DOWNSAMPLE = os.getenv("GCS_ANALYSIS_DOWNSAMPLE", "minmax")  # minmax | lttb | none
+
+
+def _buckets(a, nb, fill):
+    """ a padded to nb equal buckets -> (nb, size) array """
+    size = -(-len(a) // nb)
+    out = np.full(nb * size, fill, dtype=np.float64)
+    out[:len(a)] = a
+    return out.reshape(nb, size), size
+
+
+def minmax(x, y, n_out):
+    """ Indices of the min and max sample of n_out // 2 buckets, in order """
+    n = len(y)
+    nb = max(1, n_out // 2)
+    if n <= n_out:
+        return np.arange(n)
+    lo, size = _buckets(np.where(np.isnan(y), np.inf, y), nb, np.inf)
+    hi, _ = _buckets(np.where(np.isnan(y), -np.inf, y), nb, -np.inf)
+    base = np.arange(nb) * size
+    idx = np.sort(np.stack((base + lo.argmin(axis=1), base + hi.argmax(axis=1)), axis=1), axis=1).ravel()
+    idx = idx[idx < n]
+    return np.unique(np.concatenate(([0], idx, [n - 1])))
+
+
+def lttb(x, y, n_out):
+    """ Indices picked by Largest-Triangle-Three-Buckets (first and last sample always kept) """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # the inner samples in n_out - 2 buckets with fractional edges, as in the reference
+    # algorithm: sizes differ by at most one and the output is always n_out points
+    nb = n_out - 2
+    edges = (np.arange(nb + 1) * ((n - 2) / nb)).astype(np.int64) + 1
+    starts = edges[:-1]
+    # the third corner of each triangle is the mean of the next bucket (the last point for the last one)
+    valid = ~np.isnan(y[:n - 1])
+    with np.errstate(invalid="ignore", divide="ignore"):  # all-nan stretches of y
+        mx = np.add.reduceat(x[:n - 1], starts) / np.diff(edges)
+        my = np.add.reduceat(np.where(valid, y[:n - 1], 0.0), starts) / np.add.reduceat(valid, starts)
+    cx = np.append(mx[1:], x[-1])
+    cy = np.append(my[1:], y[-1])
+
+    picked = np.empty(nb, dtype=np.int64)
+    ax, ay = x[0], y[0]
+    for i in range(nb):
+        s, e = edges[i], edges[i + 1]
+        bx, by = x[s:e], y[s:e]
+        # twice the triangle area, up to sign, for every candidate in bucket i at once
+        area = np.abs((ax - cx[i]) * (by - ay) - (ax - bx) * (cy[i] - ay))
+        j = int(np.nanargmax(area)) if not np.isnan(area).all() else 0
+        picked[i] = s + j
+        ax, ay = bx[j], by[j]
+    return np.concatenate(([0], picked, [n - 1]))
+
+
+def downsample(x, y, n_out, method=DOWNSAMPLE):
+    """ (x, y) with about n_out points """
+    if method == "none" or len(y) <= n_out:
+        return x, y
+    idx = lttb(x, y, n_out) if method == "lttb" else minmax(x, y, n_out)
+    return x[idx], y[idx]
+
+
+class DownsampleCache:
+    """ Small LRU of downsampled series, keyed by whatever identifies a zoom level """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+        self.misses += 1
+        value = compute()
+        self._items[key] = value
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._items.clear()
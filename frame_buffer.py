@@ -0,0 +1,59 @@
+# frame_buffer.py
+import numpy as np
+
+
+class FrameRingBuffer:
+    """ Latest-frame-wins buffer between one video producer and any number of readers.
+
+    Frames live in preallocated numpy slots. The producer fills write_slot() and calls
+    publish(); readers poll latest() at display rate and always get the newest frame.
+    Nobody blocks: the only shared state is the sequence number, and rebinding an int
+    is atomic under the GIL.
+    """
+
+    def __init__(self, shape, slots=3, dtype=np.uint8):
+        if slots < 3:
+            raise ValueError("need at least 3 slots (one being read, one being written, one spare)")
+        self.shape = tuple(shape)
+        self.slots = slots
+        self._frames = np.zeros((slots,) + self.shape, dtype=dtype)
+        self._stamps = np.zeros(slots, dtype=np.float64)
+        self._seq = 0  # sequence number of the newest published frame, 0 = nothing yet
+
+    @property
+    def seq(self):
+        return self._seq
+
+    # ---------------- Producer ----------------
+    def write_slot(self):
+        """ Slot to fill next; it becomes visible to readers on publish() """
+        return self._frames[(self._seq + 1) % self.slots]
+
+    def publish(self, timestamp=0.0):
+        nxt = self._seq + 1
+        self._stamps[nxt % self.slots] = timestamp
+        self._seq = nxt
+
+    # ---------------- Readers ----------------
+    def latest(self, last_seq=0):
+        """ (seq, timestamp, frame) of the newest frame if it is newer than last_seq, else None.
+
+        The returned frame is a view into the slot, not a copy. Convert/copy it right
+        away, then confirm with is_fresh(seq) that the producer did not lap it meanwhile.
+        """
+        seq = self._seq
+        if seq == 0 or seq == last_seq:
+            return None
+        idx = seq % self.slots
+        return seq, float(self._stamps[idx]), self._frames[idx]
+
+    def is_fresh(self, seq):
+        # the producer only touches a slot again after slots - 1 further publishes
+        return self._seq - seq < self.slots - 1
+
+    def fill(self, value=0):
+        """ Paint every slot, e.g. to pre-draw letterbox bars that frames never overwrite """
+        self._frames[:] = value
+
+    def reset(self):
+        self._seq = 0
@@ -0,0 +1,78 @@
+# lod_pyramid.py
+import warnings
+import numpy as np
+
+from downsample import minmax
+
+
+class LODPyramid:
+    """ Level-of-detail pyramid over a recorded session, for zoom and pan at any scale.
+
+    Level k summarises buckets of 2**k consecutive samples as (first t, last t, and
+    min / max / mean of every channel). Levels below base_level are not stored: at those
+    zooms the raw slice is small enough to min/max-reduce on the fly. query() picks
+    the coarsest level that still has max_points buckets in view, so the work per view
+    is two binary searches plus at most a few max_points of slicing, however long the
+    session is. Memory is about 5 * 8 / 2**(base_level - 1) bytes per sample and channel.
+    """
+
+    def __init__(self, t, columns, base_level=4):
+        self.t = np.asarray(t, dtype=np.float64)
+        self.columns = {name: np.asarray(y) for name, y in columns.items()}
+        self.base_level = base_level
+        self.levels = {}  # k -> dict(t0, t1, <name>: (min, max, mean))
+        self._build()
+
+    def __len__(self):
+        return len(self.t)
+
+    def _build(self):
+        n = len(self.t)
+        size = 2 ** self.base_level
+        if n < 2 * size:
+            return
+        # first stored level straight from the raw samples, one vectorized reshape
+        m = n // size
+        level = {"t0": self.t[:m * size:size].copy(), "t1": self.t[size - 1:m * size:size].copy()}
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # buckets where a field was never sent stay nan
+            for name, y in self.columns.items():
+                b = np.asarray(y[:m * size], dtype=np.float64).reshape(m, size)
+                level[name] = (np.nanmin(b, axis=1), np.nanmax(b, axis=1), np.nanmean(b, axis=1))
+        k = self.base_level
+        self.levels[k] = level
+        # every further level halves the previous one
+        while len(level["t0"]) >= 4:
+            m = len(level["t0"]) // 2
+            nxt = {"t0": level["t0"][:2 * m:2], "t1": level["t1"][1:2 * m:2]}
+            for name in self.columns:
+                lo, hi, mean = (a[:2 * m].reshape(m, 2) for a in level[name])
+                # fmin/fmax skip a nan half, the mean of two nan halves stays nan
+                nxt[name] = (np.fmin(lo[:, 0], lo[:, 1]), np.fmax(hi[:, 0], hi[:, 1]),
+                             np.where(np.isnan(mean[:, 0]), mean[:, 1],
+                                      np.where(np.isnan(mean[:, 1]), mean[:, 0], mean.mean(axis=1))))
+            k += 1
+            self.levels[k] = level = nxt
+
+    def query(self, name, x0, x1, max_points):
+        """ (t_line, y_line, t_band, lo, hi) covering [x0, x1] with about max_points points.
+
+        At raw resolution the band is empty; on stored levels the line is the bucket mean
+        and the band is the bucket min/max, both at bucket mid times.
+        """
+        i0, i1 = np.searchsorted(self.t, (x0, x1))
+        i0, i1 = max(i0 - 1, 0), min(i1 + 1, len(self.t))
+        count = i1 - i0
+        k = int(np.ceil(np.log2(max(count / max(max_points, 1), 1))))
+        empty = np.zeros(0)
+        if k < self.base_level or not self.levels:
+            t, y = self.t[i0:i1], np.asarray(self.columns[name][i0:i1], dtype=np.float64)
+            idx = minmax(t, y, max_points)
+            return t[idx], y[idx], empty, empty, empty
+        k = min(k, max(self.levels))
+        level = self.levels[k]
+        j0 = max(int(np.searchsorted(level["t1"], x0)) - 1, 0)
+        j1 = int(np.searchsorted(level["t0"], x1, side="right")) + 1
+        lo, hi, mean = (a[j0:j1] for a in level[name])
+        mid = (level["t0"][j0:j1] + level["t1"][j0:j1]) / 2
+        return mid, mean, mid, lo, hi
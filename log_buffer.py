@@ -0,0 +1,136 @@
+# log_buffer.py
+import os
+import time
+from PyQt5 import QtCore, QtGui
+
+LOG_CAPACITY = int(os.getenv("GCS_LOG_CAPACITY", "10000"))
+
+LEVEL_COLORS = {
+    "info": "#39ff14",   # neon green
+    "warn": "#ffd60a",
+    "error": "#ff3b30",
+}
+
+
+class LogRecord:
+    __slots__ = ("seq", "time", "level", "text")
+
+    def __init__(self, seq, stamp, level, text):
+        self.seq = seq
+        self.time = stamp
+        self.level = level
+        self.text = text
+
+    def format(self):
+        return f"[{time.strftime('%H:%M:%S', time.localtime(self.time))}] {self.text}"
+
+
+class LogRingBuffer:
+    """ Fixed-capacity log history: append is O(1) and the oldest records fall off the end.
+
+    Records are addressed by their absolute sequence number (0, 1, 2, ... for the whole
+    session), so a reader that is behind can tell which records it already missed.
+    """
+
+    def __init__(self, capacity=LOG_CAPACITY):
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self.total = 0  # records ever appended
+
+    def append(self, text, level="info", stamp=None):
+        rec = LogRecord(self.total, time.time() if stamp is None else stamp, level, text)
+        self._slots[self.total % self.capacity] = rec
+        self.total += 1
+        return rec
+
+    @property
+    def first(self):
+        """ Sequence number of the oldest record still held """
+        return max(0, self.total - self.capacity)
+
+    def __len__(self):
+        return self.total - self.first
+
+    def get(self, seq):
+        if seq < self.first or seq >= self.total:
+            return None
+        return self._slots[seq % self.capacity]
+
+    def records(self):
+        """ Oldest first """
+        for seq in range(self.first, self.total):
+            yield self._slots[seq % self.capacity]
+
+    def clear(self):
+        self._slots = [None] * self.capacity
+        self.total = 0
+
+
+class LogListModel(QtCore.QAbstractListModel):
+    """ Virtualized view of a LogRingBuffer for QListView.
+
+    Appends only touch the ring; the rows are announced to the view in batches by a
+    short timer, so a burst of log lines costs one insert (and one eviction) instead of
+    one repaint per line. The view only ever asks for the rows it shows.
+    """
+
+    def __init__(self, ring=None, flush_ms=100, parent=None):
+        super().__init__(parent)
+        self.ring = ring if ring is not None else LogRingBuffer()
+        self._first = 0  # seq of row 0 as the view knows it
+        self._rows = 0
+        self._brushes = {k: QtGui.QBrush(QtGui.QColor(v)) for k, v in LEVEL_COLORS.items()}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_ms)
+        self._timer.timeout.connect(self.flush)
+
+    def append(self, text, level="info"):
+        rec = self.ring.append(text, level)
+        if not self._timer.isActive():
+            self._timer.start()
+        return rec
+
+    def flush(self):
+        """ Tell the view about everything appended since the last flush """
+        first, total = self.ring.first, self.ring.total
+        if total == self._first + self._rows:
+            return
+        if first >= self._first + self._rows:
+            # a whole buffer's worth arrived in one batch: nothing on screen survives
+            self.beginResetModel()
+            self._first, self._rows = first, total - first
+            self.endResetModel()
+            return
+        if first > self._first:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, first - self._first - 1)
+            self._rows -= first - self._first
+            self._first = first
+            self.endRemoveRows()
+        if total > self._first + self._rows:
+            start = self._rows
+            self.beginInsertRows(QtCore.QModelIndex(), start, total - self._first - 1)
+            self._rows = total - self._first
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.ring.clear()
+        self._first = self._rows = 0
+        self.endResetModel()
+
+    # ---------------- Qt model API ----------------
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        rec = self.ring.get(self._first + index.row())
+        if rec is None:
+            return None  # evicted, the next flush removes the row
+        if role == QtCore.Qt.DisplayRole:
+            return rec.format()
+        if role == QtCore.Qt.ForegroundRole:
+            return self._brushes.get(rec.level)
+        if role == QtCore.Qt.UserRole:
+            return rec
+        return None
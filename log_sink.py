@@ -0,0 +1,183 @@
+# log_sink.py
+import os
+import glob
+import gzip
+import time
+import queue
+import shutil
+import threading
+
+LOG_DIR = os.getenv("GCS_LOG_DIR", "logs")
+LOG_MAX_BYTES = int(os.getenv("GCS_LOG_MAX_BYTES", str(4 * 1024 * 1024)))
+LOG_MAX_AGE_S = float(os.getenv("GCS_LOG_MAX_AGE_S", "3600"))
+LOG_COMPRESS = os.getenv("GCS_LOG_COMPRESS", "1") not in ("0", "false", "no")
+LOG_KEEP_FILES = int(os.getenv("GCS_LOG_KEEP_FILES", "50"))
+LOG_MAX_QUEUE = int(os.getenv("GCS_LOG_MAX_QUEUE", "100000"))  # lines waiting for the writer, then drop
+
+
+class LogSink:
+    """ Continuous on-disk log, written off the GUI thread.
+
+    write() only queues the line. A writer thread drains the queue in batches (one
+    write + flush per batch) into logs/<name>_<session>_<NNN>.log, and rotates to a
+    new segment when the current one passes max_bytes or max_age_s. Finished segments
+    are gzipped when compress is on, and only the newest keep_files are kept.
+
+    A failing disk (full, USB stick pulled) does not stop the writer: the lines of a
+    failed write are counted in `dropped`, on_error(message) is called once (from the
+    writer thread) and writing resumes into a fresh segment when the disk is back. The
+    queue is bounded too, so a stalled writer costs lines, not memory.
+    """
+
+    def __init__(self, name, directory=LOG_DIR, max_bytes=LOG_MAX_BYTES, max_age_s=LOG_MAX_AGE_S,
+                 compress=LOG_COMPRESS, keep_files=LOG_KEEP_FILES, batch_s=0.5, max_queue=LOG_MAX_QUEUE,
+                 on_error=None):
+        self.name = name
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.compress = compress
+        self.keep_files = keep_files
+        self.batch_s = batch_s
+        self.on_error = on_error
+        self.session = time.strftime("%Y%m%d_%H%M%S")
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._file = None
+        self._part = 0
+        self._opened_at = 0.0
+        self.lines = 0
+        self.dropped = 0
+        self.error = None  # last write error, None once writing works again
+
+    @property
+    def pattern(self):
+        return os.path.join(self.directory, f"{self.name}_{self.session}_*.log*")
+
+    def segments(self):
+        """ Files of this session, oldest first (the last one may still be open) """
+        return sorted(glob.glob(self.pattern))
+
+    # ---------------- Any thread ----------------
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, line):
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1  # never block the GUI on the disk
+
+    def save_to(self, dest_dir, on_done=None):
+        """ Finish the current segment and copy the session's files to dest_dir.
+
+        Runs on the writer thread; on_done(dest_dir, paths, error) is called from there too,
+        error being None or why the save stopped (paths then holds what was copied so far).
+        """
+        self._queue.put(("save", dest_dir, on_done))
+
+    def stop(self, wait=True):
+        self._queue.put(None)
+        if wait and self._thread is not None:
+            self._thread.join(timeout=5.0)
+
+    # ---------------- Writer thread ----------------
+    def _run(self):
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self.batch_s)]
+            except queue.Empty:
+                batch = []
+            # whatever else is already queued goes into the same write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for item in batch:
+                if isinstance(item, str):
+                    lines.append(item)
+                    continue
+                self._guarded(self._write, lines)
+                lines = []
+                if item is None:
+                    running = False
+                    break
+                _, dest_dir, on_done = item
+                paths, error = [], None
+                try:
+                    self._rotate()
+                    self._copy(dest_dir, paths)
+                except OSError as e:
+                    error = str(e)  # read-only or full destination: report it, keep logging
+                if on_done is not None:
+                    on_done(dest_dir, paths, error)
+            self._guarded(self._write, lines)
+            if self._file is not None and time.time() - self._opened_at >= self.max_age_s:
+                self._guarded(self._rotate)
+        self._guarded(self._rotate)
+
+    def _guarded(self, fn, *args):
+        """ fn(*args), but an OSError costs the lines being written instead of the writer thread """
+        lines = args[0] if args else ()
+        written = self.lines
+        try:
+            fn(*args)
+        except OSError as e:
+            self.dropped += len(lines) - (self.lines - written)
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None  # next write starts a new segment
+            if self.error is None and self.on_error is not None:
+                self.on_error(f"log {self.name}: {e}")  # once per outage, not once per batch
+            self.error = e
+            return
+        if lines:
+            self.error = None
+
+    def _write(self, lines, chunk=256):
+        # chunked, so a big backlog still rotates close to max_bytes
+        for i in range(0, len(lines), chunk):
+            if self._file is None:
+                self._part += 1
+                path = os.path.join(self.directory, f"{self.name}_{self.session}_{self._part:03d}.log")
+                self._file = open(path, "a", encoding="utf-8")
+                self._opened_at = time.time()
+            part = lines[i:i + chunk]
+            self._file.write("\n".join(part) + "\n")
+            self.lines += len(part)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+        if self._file is not None:
+            self._file.flush()
+
+    def _rotate(self):
+        """ Close the open segment (compressing it if enabled) and apply retention """
+        if self._file is None:
+            return
+        path = self._file.name
+        self._file.close()
+        self._file = None
+        if self.compress:
+            with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(path)
+        for old in self.segments()[:-self.keep_files]:
+            os.remove(old)
+
+    def _copy(self, dest_dir, paths):
+        os.makedirs(dest_dir, exist_ok=True)
+        for p in self.segments():
+            dest = os.path.join(dest_dir, os.path.basename(p))
+            if not (os.path.exists(dest) and os.path.samefile(p, dest)):  # saving into the log dir itself
+                shutil.copy2(p, dest)
+            paths.append(dest)
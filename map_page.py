@@ -0,0 +1,249 @@
+# map_page.py
+"""
+The rover map: one generated Leaflet page, loaded once, driven through a small JS API.
+
+The page comes from map_template.html (Leaflet plus the script below, nothing else), or
+from folium with GCS_MAP_TEMPLATE=folium. Either way it defines a global `gcs` object
+(folium names its map `map_<hash>`, so the API is bound to m.get_name() there):
+
+  gcs.pushPositions([[lat, lon], ...])   append vertices to the track
+  gcs.setRover(lat, lon)                 move the rover; the track's loose end follows it
+  gcs.setLocked(locked)                  rover green when the target lock is on
+  gcs.addMarker(id, lat, lon, popup)     add or move a named marker
+  gcs.removeMarker(id)
+  gcs.setWaypoints([[lat, lon], ...])    replace the mission waypoints (numbered, joined by a dashed line)
+  gcs.setRoute([[lat, lon], ...])        planned route polyline
+  gcs.setLayerVisible(name, visible)     name: "track", "rover", "markers", "waypoints" or "route"
+  gcs.clearTrack()
+  gcs.apply({positions: [...], rover: [lat, lon], ops: [[fn, args...], ...]})
+                                         everything above in one call; MapBridge only uses this
+
+MapBridge queues calls on the Python side and sends them as one apply() per frame, so
+the cost of talking to the page no longer scales with the telemetry rate. The track
+vertices come from map_track.Track, which only passes on the significant ones.
+"""
+
+import os
+import json
+from string import Template
+
+from PyQt5 import QtCore
+
+from tile_server import TILE_UPSTREAM, server as tile_server
+
+MAP_FRAME_MS = int(os.getenv("GCS_MAP_FRAME_MS", "16"))  # at most one page call per frame
+# "lean": map_template.html, Leaflet and our scripts only; "folium": folium's page (jQuery, Bootstrap, ...)
+MAP_TEMPLATE = os.getenv("GCS_MAP_TEMPLATE", "lean")
+
+LEAFLET_URL = "https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/"  # same build folium uses, one cache entry
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "map_template.html")
+
+# %(map)s, %(lat)s, %(lon)s and %(initial)s are filled in by render_map_page
+MAP_API_JS = """
+var gcs = (function (map) {
+    var track = L.polyline([], {color: 'blue'}).addTo(map);
+    // vector rover and waypoints: no marker images to fetch
+    var rover = L.circleMarker([%(lat)s, %(lon)s], {radius: 8, color: 'white', weight: 2,
+                                                  fillColor: 'red', fillOpacity: 1}).addTo(map).bindPopup("Rover");
+    var markers = L.layerGroup().addTo(map);
+    var waypoints = L.layerGroup().addTo(map);
+    var route = L.polyline([], {color: 'red', weight: 3}).addTo(map);
+    var layers = {track: track, rover: rover, markers: markers, waypoints: waypoints, route: route};
+    var byId = {};
+    var locked = false;
+    var tail = null;  // last point of the track line is the rover itself, not a stored vertex
+
+    var api = {
+        firstPaintMs: null,
+        pushPositions: function (samples) {
+            if (!samples.length) return;
+            var latlngs = track.getLatLngs();
+            if (tail) latlngs.pop();
+            for (var i = 0; i < samples.length; i++) latlngs.push(L.latLng(samples[i][0], samples[i][1]));
+            if (tail) latlngs.push(tail);
+            track.setLatLngs(latlngs);  // one redraw for the whole batch
+        },
+        setRover: function (lat, lon) {
+            var latlngs = track.getLatLngs();
+            if (tail) latlngs.pop();
+            tail = L.latLng(lat, lon);
+            latlngs.push(tail);
+            track.setLatLngs(latlngs);
+            rover.setLatLng(tail);
+        },
+        setLocked: function (on) {
+            on = !!on;
+            if (on === locked) return;
+            locked = on;
+            rover.setStyle({fillColor: on ? 'limegreen' : 'red'});
+        },
+        addMarker: function (id, lat, lon, popup) {
+            if (byId[id]) {
+                byId[id].setLatLng([lat, lon]);
+            } else {
+                byId[id] = L.marker([lat, lon]).addTo(markers);
+            }
+            if (popup) byId[id].bindPopup(popup);
+        },
+        removeMarker: function (id) {
+            if (!byId[id]) return;
+            markers.removeLayer(byId[id]);
+            delete byId[id];
+        },
+        setWaypoints: function (points) {
+            waypoints.clearLayers();
+            for (var i = 0; i < points.length; i++) {
+                L.circleMarker(points[i], {radius: 6, color: 'navy', fillColor: 'dodgerblue', fillOpacity: 1})
+                    .bindTooltip("Waypoint " + (i + 1)).addTo(waypoints);
+            }
+            if (points.length > 1) L.polyline(points, {color: 'red', weight: 2.5, dashArray: '6 4'}).addTo(waypoints);
+        },
+        setRoute: function (points) {
+            route.setLatLngs(points);
+        },
+        setLayerVisible: function (name, visible) {
+            var layer = layers[name];
+            if (!layer) return;
+            if (visible) layer.addTo(map); else map.removeLayer(layer);
+        },
+        clearTrack: function () {
+            tail = null;
+            track.setLatLngs([]);
+        },
+        apply: function (batch) {
+            // ops first: positions queued after a clearTrack belong on the new track
+            (batch.ops || []).forEach(function (op) { api[op[0]].apply(null, op.slice(1)); });
+            api.pushPositions(batch.positions || []);
+            if (batch.rover) api.setRover(batch.rover[0], batch.rover[1]);
+        }
+    };
+    // first time every visible tile is in (ms since navigation start), read by bench_map_startup
+    map.eachLayer(function (layer) {
+        if (layer instanceof L.TileLayer) layer.once('load', function () { api.firstPaintMs = performance.now(); });
+    });
+    return api;
+})(%(map)s);
+gcs.apply(%(initial)s);
+"""
+
+
+def render_map_page(lat=28.6, lon=77.2, zoom=16, waypoints=(), route=(), rover=True, template=MAP_TEMPLATE):
+    """ HTML of a map page with the gcs API; waypoints / route / rover visibility are set at load """
+    ops = []
+    if waypoints:
+        ops.append(["setWaypoints", [list(p) for p in waypoints]])
+    if route:
+        ops.append(["setRoute", [list(p) for p in route]])
+    if not rover:
+        ops.append(["setLayerVisible", "rover", False])
+    values = {"lat": lat, "lon": lon, "initial": json.dumps({"ops": ops})}
+
+    if template == "folium":
+        import folium
+        from branca.element import MacroElement
+        from jinja2 import Template as JinjaTemplate
+        m = folium.Map(location=[lat, lon], zoom_start=zoom)
+        # a child's script macro is rendered after its parent's, so the map variable exists by then
+        api = MacroElement()
+        api._template = JinjaTemplate("{% macro script(this, kwargs) %}" + MAP_API_JS % dict(values, map=m.get_name())
+                                      + "{% endmacro %}")
+        api.add_to(m)
+        html = m.get_root().render()
+    else:
+        with open(TEMPLATE_PATH, encoding="utf-8") as f:
+            page = Template(f.read())
+        html = page.substitute(leaflet=LEAFLET_URL, tiles=TILE_UPSTREAM, lat=lat, lon=lon, zoom=zoom,
+                               api=MAP_API_JS % dict(values, map="map"))
+    return tile_server.localize(html)  # tiles and Leaflet from the local cache
+
+
+def generate_map_page(lat=28.6, lon=77.2, fname="rover_map.html", zoom=16, **kwargs):
+    """ Write the map page and return its path """
+    with open(fname, "w", encoding="utf-8") as f:
+        f.write(render_map_page(lat, lon, zoom, **kwargs))
+    return fname
+
+
+class MapBridge(QtCore.QObject):
+    """ Python side of the gcs API: queues calls, sends them as one apply() per frame.
+
+    Calls made before the page finished loading are kept and sent once it has.
+    """
+
+    def __init__(self, page=None, frame_ms=MAP_FRAME_MS, parent=None):
+        super().__init__(parent)
+        self.page = None
+        self._ready = False
+        self._positions = []
+        self._rover = None
+        self._ops = []
+        self.calls = 0  # runJavaScript calls made, for the curious
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(frame_ms)
+        self._timer.timeout.connect(self.flush)
+        if page is not None:
+            self.attach(page)
+
+    def attach(self, page):
+        self.page = page
+        self._ready = False
+        page.loadFinished.connect(self._on_loaded)
+
+    def _on_loaded(self, ok):
+        self._ready = bool(ok)
+        self._schedule()
+
+    # ---------------- API (queued) ----------------
+    def push_positions(self, samples):
+        """ Track vertices: iterable of (lat, lon) """
+        self._positions.extend([float(lat), float(lon)] for lat, lon in samples)
+        self._schedule()
+
+    def set_rover(self, lat, lon):
+        # only the newest position of a frame is sent
+        self._rover = [float(lat), float(lon)]
+        self._schedule()
+
+    def set_locked(self, locked):
+        self._call("setLocked", bool(locked))
+
+    def add_marker(self, marker_id, lat, lon, popup=""):
+        self._call("addMarker", str(marker_id), float(lat), float(lon), popup)
+
+    def remove_marker(self, marker_id):
+        self._call("removeMarker", str(marker_id))
+
+    def set_waypoints(self, points):
+        self._call("setWaypoints", [[float(lat), float(lon)] for lat, lon in points])
+
+    def set_route(self, points):
+        self._call("setRoute", [[float(lat), float(lon)] for lat, lon in points])
+
+    def set_layer_visible(self, name, visible):
+        self._call("setLayerVisible", name, bool(visible))
+
+    def clear_track(self):
+        # positions queued before this call go with the rest of the track; apply() runs ops first
+        self._positions = []
+        self._call("clearTrack")
+
+    def _call(self, fn, *args):
+        self._ops.append([fn, *args])
+        self._schedule()
+
+    # ---------------- Sending ----------------
+    def _schedule(self):
+        if self._ready and self._pending() and not self._timer.isActive():
+            self._timer.start()
+
+    def _pending(self):
+        return bool(self._positions or self._ops or self._rover)
+
+    def flush(self):
+        if not self._ready or not self._pending():
+            return
+        batch = {"positions": self._positions, "rover": self._rover, "ops": self._ops}
+        self._positions, self._rover, self._ops = [], None, []
+        self.calls += 1
+        self.page.runJavaScript(f"gcs.apply({json.dumps(batch)});")
@@ -0,0 +1,98 @@
+# map_service.py
+"""
+One web engine setup for every map in the app.
+
+  - one named QWebEngineProfile with a disk HTTP cache: a view created later finds what
+    an earlier one already fetched, and since the tile server keeps its port
+    (GCS_TILE_PORT) the cached URLs still match after a restart
+  - pages are served from the local tile server (tile_server.publish) and Chromium runs
+    with --process-per-site: every map view is the same site, which lets Chromium put
+    them in one renderer process instead of one each. How much that saves is what
+    bench_map_startup.py --views N --mode shared|separate measures
+  - a view loads its page the first time it is shown, so maps on tabs nobody opened
+    cost nothing at startup
+
+configure() sets the Chromium flags and must run before the QApplication is created.
+"""
+
+import os
+import tempfile
+
+from PyQt5 import QtCore, QtWidgets, QtWebEngineWidgets
+
+from tile_server import TILE_DIR, TILE_SERVER, server as tile_server
+
+MAP_PROFILE_DIR = os.getenv("GCS_MAP_PROFILE_DIR", os.path.join(TILE_DIR, "profile"))
+MAP_HTTP_CACHE_MB = int(os.getenv("GCS_MAP_HTTP_CACHE_MB", "128"))
+MAP_RENDERER_LIMIT = int(os.getenv("GCS_MAP_RENDERER_LIMIT", "0"))  # 0: leave it to Chromium
+
+
+def configure():
+    """ Chromium flags for the map views (read once, when QtWebEngine starts) """
+    flags = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split()
+    wanted = ["--process-per-site"]
+    if MAP_RENDERER_LIMIT:
+        wanted.append(f"--renderer-process-limit={MAP_RENDERER_LIMIT}")
+    flags += [f for f in wanted if f not in flags]
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(flags)
+
+
+class MapView(QtWebEngineWidgets.QWebEngineView):
+    """ Map view on the shared profile; load_when_shown() defers the page load until it is visible """
+
+    def __init__(self, profile, parent=None):
+        super().__init__(parent)
+        self.setPage(QtWebEngineWidgets.QWebEnginePage(profile, self))
+        self._pending = None
+
+    def load_when_shown(self, url):
+        if self.isVisible():
+            self.load(url)
+        else:
+            self._pending = url
+
+    def showEvent(self, ev):
+        super().showEvent(ev)
+        if self._pending is not None:
+            url, self._pending = self._pending, None
+            self.load(url)
+
+
+class MapService:
+    """ Hands out map views that share one profile, cache and renderer """
+
+    def __init__(self):
+        self._profile = None
+        self.views = 0
+
+    def profile(self):
+        if self._profile is None:
+            os.makedirs(MAP_PROFILE_DIR, exist_ok=True)
+            # a named profile is disk-backed; parented to the app so it outlives every page
+            p = QtWebEngineWidgets.QWebEngineProfile("gcs-maps", QtWidgets.QApplication.instance())
+            p.setCachePath(os.path.abspath(os.path.join(MAP_PROFILE_DIR, "cache")))
+            p.setPersistentStoragePath(os.path.abspath(os.path.join(MAP_PROFILE_DIR, "storage")))
+            p.setHttpCacheType(QtWebEngineWidgets.QWebEngineProfile.DiskHttpCache)
+            p.setHttpCacheMaximumSize(MAP_HTTP_CACHE_MB * 1024 * 1024)
+            self._profile = p
+        return self._profile
+
+    def create_view(self, parent=None):
+        self.views += 1
+        return MapView(self.profile(), parent)
+
+    def page_url(self, name, html):
+        """ Where a view finds the page: the tile server's origin, or a temp file with the server off """
+        if TILE_SERVER:
+            return QtCore.QUrl(tile_server.publish(name, html))
+        path = os.path.join(tempfile.gettempdir(), f"gcs_{name}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+        return QtCore.QUrl.fromLocalFile(path)
+
+    def show_page(self, view, name, html):
+        view.load_when_shown(self.page_url(name, html))
+
+
+# one service for every map view, like the tile server
+service = MapService()
@@ -0,0 +1,138 @@
+# map_track.py
+"""
+The rover track, kept on the Python side.
+
+Every position goes into one growable numpy array (t, lat, lon): that is the
+full-resolution track, and what export() writes. The map only gets the vertices an
+online Douglas-Peucker pass (the "opening window" variant) finds significant: a
+point is sent once the points since the last sent vertex no longer fit within
+`tolerance_m` of a straight segment. Straight runs collapse to their two ends, so
+the Leaflet polyline grows with the number of turns, not with mission time.
+
+Run:
+ python map_track.py --bench          # vertices kept and cost for a simulated 3 h drive
+"""
+
+import os
+import sys
+import time
+import datetime
+
+import numpy as np
+
+TRACK_TOLERANCE_M = float(os.getenv("GCS_TRACK_TOLERANCE_M", "1.0"))
+TRACK_MAX_WINDOW = 512          # samples since the last vertex before one is forced anyway
+
+M_PER_DEG = 111320.0
+
+
+class Track:
+    """ Full-resolution (t, lat, lon) track plus its online simplification """
+
+    def __init__(self, tolerance_m=TRACK_TOLERANCE_M, max_window=TRACK_MAX_WINDOW):
+        self.tolerance_m = tolerance_m
+        self.max_window = max_window
+        self._buf = np.empty((4096, 3))
+        self._n = 0
+        self._anchor = -1     # index of the last vertex sent to the map
+        self.vertices = 0
+
+    def __len__(self):
+        return self._n
+
+    def points(self):
+        """ (n, 3) t, lat, lon, oldest first (a view, no copy) """
+        return self._buf[:self._n]
+
+    def clear(self):
+        self._n = 0
+        self._anchor = -1
+        self.vertices = 0
+
+    def add(self, lat, lon, t=None):
+        """ Store one position; returns the vertices (lat, lon) it made significant """
+        if self._n == len(self._buf):
+            self._buf = np.concatenate((self._buf, np.empty_like(self._buf)))  # amortised doubling
+        self._buf[self._n] = (time.time() if t is None else t, lat, lon)
+        self._n += 1
+        return self._simplify()
+
+    def extend(self, samples):
+        """ samples: iterable of (lat, lon) or (lat, lon, t); returns the new vertices """
+        out = []
+        for s in samples:
+            out += self.add(*s)
+        return out
+
+    def _simplify(self):
+        n = self._n
+        if self._anchor < 0:
+            self._anchor = 0  # the first point always starts the line
+            return self._emit(0)
+        a, last = self._anchor, n - 1
+        if last - a < 2:
+            return []
+        # cross-track distance of every point since the anchor from the segment anchor -> newest, in metres
+        p = self._buf[a:n, 1:]
+        scale = np.array((M_PER_DEG, M_PER_DEG * np.cos(np.radians(p[0, 0]))))
+        d = (p - p[0]) * scale
+        seg = d[-1]
+        length = np.hypot(*seg)
+        inner = d[1:-1]
+        if length > 0:
+            off = np.abs(inner[:, 0] * seg[1] - inner[:, 1] * seg[0]) / length
+        else:
+            off = np.hypot(inner[:, 0], inner[:, 1])
+        if off.max() > self.tolerance_m or last - a > self.max_window:
+            # the newest point broke the line: the one before it ends the segment
+            self._anchor = last - 1
+            return self._emit(last - 1)
+        return []
+
+    def _emit(self, i):
+        self.vertices += 1
+        return [(float(self._buf[i, 1]), float(self._buf[i, 2]))]
+
+    # ---------------- Export ----------------
+    def export(self, path):
+        """ Full-resolution track as .gpx, anything else as CSV """
+        pts = self.points()
+        with open(path, "w", encoding="utf-8") as f:
+            if path.lower().endswith(".gpx"):
+                f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                        '<gpx version="1.1" creator="GCS" xmlns="http://www.topografix.com/GPX/1/1">\n'
+                        '<trk><name>rover</name><trkseg>\n')
+                for t, lat, lon in pts:
+                    stamp = datetime.datetime.fromtimestamp(t, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+                    f.write(f'<trkpt lat="{lat:.8f}" lon="{lon:.8f}"><time>{stamp}</time></trkpt>\n')
+                f.write("</trkseg></trk>\n</gpx>\n")
+            else:
+                f.write("t,lat,lon\n")
+                np.savetxt(f, pts, fmt=("%.3f", "%.8f", "%.8f"), delimiter=",")
+        return len(pts)
+
+
+def main():
+    if "--bench" not in sys.argv:
+        print(__doc__)
+        return
+    # 3 h at 10 Hz: straight legs, gentle curves and turns, GPS noise of a few decimetres
+    rng = np.random.default_rng(0)
+    n = 3 * 3600 * 10
+    turn = np.repeat(rng.choice([0.0, 0.0, 0.002, -0.002, 0.05, -0.05], n // 300 + 1), 300)[:n]
+    heading = np.cumsum(turn)
+    step = 1.2 / 10 / M_PER_DEG  # 1.2 m/s
+    lat = 28.6 + np.cumsum(step * np.cos(heading)) + rng.normal(0, 0.2 / M_PER_DEG, n)
+    lon = 77.2 + np.cumsum(step * np.sin(heading) / np.cos(np.radians(28.6))) + rng.normal(0, 0.2 / M_PER_DEG, n)
+    for tol in (0.5, 1.0, 2.0, 5.0):
+        track = Track(tolerance_m=tol)
+        t0 = time.perf_counter()
+        for i in range(n):
+            track.add(lat[i], lon[i], float(i) / 10)
+        dt = time.perf_counter() - t0
+        print(f"tolerance {tol:4.1f} m: {n} samples -> {track.vertices} map vertices "
+              f"({100.0 * track.vertices / n:.2f} %), {dt * 1e6 / n:.1f} us/sample")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# metric_registry.py
+from PyQt5 import QtCore
+
+
+class Metric:
+    """ One telemetry field that can be plotted: the key it has in telemetry dicts and how to show it """
+
+    def __init__(self, name, title=None, color=None, enabled=False):
+        self.name = name
+        self.title = title or name
+        self.color = color
+        self.enabled = enabled
+
+
+class MetricRegistry(QtCore.QObject):
+    """ Every known plot channel, in display order.
+
+    Registering a field makes the analysis plots store it (one extra column in their
+    shared column store); enabling it adds a subplot on the shared time axis. Views
+    listen to `changed` and re-lay out once; they never get a timer per channel.
+    """
+
+    changed = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._metrics = {}
+
+    def register(self, name, title=None, color=None, enabled=False):
+        """ Add a channel (or update the title/colour of a known one) """
+        m = self._metrics.get(name)
+        if m is None:
+            # fields registered without a colour take the next one of matplotlib's cycle
+            m = self._metrics[name] = Metric(name, title, color or f"C{len(self._metrics) % 10}", enabled)
+        else:
+            m.title = title or m.title
+            m.color = color or m.color
+        self.changed.emit()
+        return m
+
+    def set_enabled(self, name, on=True):
+        m = self._metrics.get(name) or self.register(name)
+        if m.enabled != on:
+            m.enabled = on
+            self.changed.emit()
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def names(self):
+        return tuple(self._metrics)
+
+    def enabled(self):
+        return [m for m in self._metrics.values() if m.enabled]
+
+    def __iter__(self):
+        return iter(list(self._metrics.values()))
+
+    def __contains__(self, name):
+        return name in self._metrics
+
+
+# one registry for the whole app, like the telemetry bus
+metrics = MetricRegistry()
+metrics.register("battery", "Battery Life (%)", "green", enabled=True)
+metrics.register("speed", "Speed (m/s)", "blue", enabled=True)
+metrics.register("temp", "Temperature (°C)", "red", enabled=True)
+metrics.register("distance", "Distance (m)", "purple")
+metrics.register("lat", "Latitude (°)", "teal")
+metrics.register("lon", "Longitude (°)", "darkcyan")
+metrics.register("servo", "Servo (°)", "orange")
+metrics.register("pan", "Cam Pan (°)", "brown")
+metrics.register("tilt", "Cam Tilt (°)", "olive")
+metrics.register("link_latency", "Link Latency (ms)", "magenta")
+metrics.register("decode_fps", "Decode (fps)", "gray")
@@ -1,16 +1,18 @@
 # mission_planner.py
-import os
 import random
-import tempfile
 import requests
-from PyQt5 import QtCore, QtWidgets, QtWebEngineWidgets
-import folium
+from PyQt5 import QtCore, QtWidgets
+
+from map_page import MapBridge, render_map_page
+from map_service import service as map_service
+from tile_server import server as tile_server
 
 
 class MissionPlanner(QtWidgets.QWidget):
-    """ Mission Planner module with interactive Folium map + ORS directions """
+    """ Mission Planner module with interactive Leaflet map + ORS directions """
 
     mission_uploaded = QtCore.pyqtSignal(list)  # emits list of waypoints
+    prefetch_progress = QtCore.pyqtSignal(int, int)  # done, total (emitted from the prefetch thread)
 
     def __init__(self, ORS_KEY=None, parent=None):
         super().__init__(parent)
@@ -20,12 +22,11 @@ class MissionPlanner(QtWidgets.QWidget):
 
         layout = QtWidgets.QVBoxLayout(self)
 
-        # ---------- Top: Folium Map ----------
-        self.map_path = os.path.join(tempfile.gettempdir(), "mission_map.html")
-        self._generate_map()
-
-        self.web_view = QtWebEngineWidgets.QWebEngineView()
-        self.web_view.setUrl(QtCore.QUrl.fromLocalFile(self.map_path))
+        # ---------- Top: Map ----------
+        # loaded once (when the tab is first opened); waypoint changes go through the gcs API, no reload
+        self.web_view = map_service.create_view()
+        self.map_bridge = MapBridge(self.web_view.page(), parent=self)
+        map_service.show_page(self.web_view, "mission.html", render_map_page(28.61, 77.23, zoom=13, rover=False))
         layout.addWidget(self.web_view, 3)
 
         # ---------- Middle: Waypoints ----------
@@ -39,9 +40,12 @@ class MissionPlanner(QtWidgets.QWidget):
         self.btn_add = QtWidgets.QPushButton("➕ Add WP")
         self.btn_remove = QtWidgets.QPushButton("🗑 Remove WP")
         self.btn_clear = QtWidgets.QPushButton("❌ Clear All")
+        self.btn_prefetch = QtWidgets.QPushButton("⬇ Prefetch Tiles")
+        self.btn_prefetch.setToolTip("Download map tiles around the waypoints for offline use")
         btns.addWidget(self.btn_add)
         btns.addWidget(self.btn_remove)
         btns.addWidget(self.btn_clear)
+        btns.addWidget(self.btn_prefetch)
         wp_layout.addLayout(btns)
 
         layout.addWidget(wp_group, 2)
@@ -72,6 +76,8 @@ class MissionPlanner(QtWidgets.QWidget):
         self.btn_remove.clicked.connect(self._remove_waypoint)
         self.btn_clear.clicked.connect(self._clear_waypoints)
         self.btn_upload.clicked.connect(self._upload_mission)
+        self.btn_prefetch.clicked.connect(self._prefetch_tiles)
+        self.prefetch_progress.connect(self._on_prefetch_progress)
 
         self.btn_start.clicked.connect(lambda: self._log("[MISSION] Started"))
         self.btn_pause.clicked.connect(lambda: self._log("[MISSION] Paused"))
@@ -79,16 +85,8 @@ class MissionPlanner(QtWidgets.QWidget):
         self.btn_abort.clicked.connect(lambda: self._log("[MISSION] Aborted"))
 
     # ---------------- Map Functions ----------------
-    def _generate_map(self):
-        """Generate initial map or update with waypoints"""
-        m = folium.Map(location=[28.61, 77.23], zoom_start=13)
-
-        # Draw markers
-        for i, wp in enumerate(self.waypoints, start=1):
-            folium.Marker(wp, popup=f"WP {i}", tooltip=f"Waypoint {i}",
-                          icon=folium.Icon(color="blue", icon="flag")).add_to(m)
-
-        # Draw path using ORS if key is available
+    def _route(self):
+        """ Road route through the waypoints from ORS, [] without a key or on error """
         if len(self.waypoints) > 1 and self.ORS_KEY:
             try:
                 coords = [[lon, lat] for lat, lon in self.waypoints]  # ORS requires [lon,lat]
@@ -100,21 +98,37 @@ class MissionPlanner(QtWidgets.QWidget):
                 if resp.status_code == 200:
                     data = resp.json()
                     route_coords = [(lat, lon) for lon, lat in data["features"][0]["geometry"]["coordinates"]]
-                    folium.PolyLine(route_coords, color="red", weight=3).add_to(m)
                     self._log("[ORS] Route added successfully")
+                    return route_coords
                 else:
                     self._log(f"[ORS ERROR] {resp.status_code}: {resp.text}")
             except Exception as e:
                 self._log(f"[ORS Exception] {e}")
-
-        elif len(self.waypoints) > 1:
-            folium.PolyLine(self.waypoints, color="red", weight=2.5).add_to(m)
-
-        m.save(self.map_path)
+        return []
 
     def _refresh_map(self):
-        self._generate_map()
-        self.web_view.setUrl(QtCore.QUrl.fromLocalFile(self.map_path))
+        # waypoints are numbered and joined by a straight dashed line on the page itself
+        self.map_bridge.set_waypoints(self.waypoints)
+        self.map_bridge.set_route(self._route())
+
+    def _prefetch_tiles(self):
+        # mission bounding box plus a margin, or the default view when there are no waypoints yet
+        if self.waypoints:
+            lats, lons = zip(*self.waypoints)
+            bbox = (min(lats) - 0.01, min(lons) - 0.01, max(lats) + 0.01, max(lons) + 0.01)
+        else:
+            bbox = (28.56, 77.18, 28.66, 77.28)
+        try:
+            total = tile_server.prefetch(bbox, range(12, 18), self.prefetch_progress.emit)
+        except ValueError as e:
+            self._log(f"[TILES] {e}")
+            return
+        self._log(f"[TILES] Prefetching {total} tiles for {bbox}")
+
+    def _on_prefetch_progress(self, done, total):
+        if done == total:
+            c = tile_server.cache
+            self._log(f"[TILES] Prefetch done: {total} tiles, cache {c.bytes / 1e6:.1f} MB")
 
     # ---------------- Waypoint Functions ----------------
     def _add_waypoint(self):
@@ -0,0 +1,124 @@
+# mjpeg_server.py
+"""
+Local stand-in for a rover/drone camera link: serves any video_source URI as an
+MJPEG stream over HTTP, so the GCS can be load-tested with N feeds on a box with
+no cameras. Frames are encoded once and shared by every connected client.
+
+Run:
+ python mjpeg_server.py --source synthetic:1280x720@30 --port 8081
+ GCS_FRONT_CAM=http://127.0.0.1:8081/stream.mjpg python GCS_MODEL.py
+"""
+
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+from video_source import open_source
+
+BOUNDARY = b"gcsframe"
+
+
+class FrameHub:
+    """ Reads one source and keeps the newest JPEG for all clients """
+
+    def __init__(self, uri, quality=80):
+        self.uri = uri
+        self.quality = quality
+        self.jpeg = None
+        self.seq = 0
+        self._cond = threading.Condition()
+        self._running = False
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def stop(self):
+        self._running = False
+
+    def _run(self):
+        src = open_source(self.uri)
+        if not src.open():
+            raise RuntimeError(f"cannot open {self.uri}")
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        while self._running:
+            src.pace()
+            ret, frame = src.read()
+            if not ret:
+                continue
+            ok, buf = cv2.imencode(".jpg", frame, params)
+            if not ok:
+                continue
+            with self._cond:
+                self.jpeg = buf.tobytes()
+                self.seq += 1
+                self._cond.notify_all()
+        src.release()
+
+    def wait_frame(self, last_seq, timeout=2.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq != last_seq, timeout)
+            return self.seq, self.jpeg
+
+
+def make_handler(hub):
+    class MJPEGHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/stream.mjpg"):
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=" + BOUNDARY.decode())
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            seq = 0
+            try:
+                while True:
+                    seq, jpeg = hub.wait_frame(seq)
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n")
+                    self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg + b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # client went away
+
+        def log_message(self, fmt, *args):
+            pass  # one line per client would drown the console during load tests
+
+    return MJPEGHandler
+
+
+def serve(uri, host="127.0.0.1", port=8081, quality=80):
+    """ Start hub + server in the background; returns the server (call shutdown() to stop) """
+    hub = FrameHub(uri, quality)
+    hub.start()
+    server = ThreadingHTTPServer((host, port), make_handler(hub))
+    server.daemon_threads = True
+    server.hub = hub
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve a video source as MJPEG over HTTP")
+    ap.add_argument("--source", default="synthetic:1280x720@30")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8081)
+    ap.add_argument("--quality", type=int, default=80)
+    args = ap.parse_args()
+
+    server = serve(args.source, args.host, args.port, args.quality)
+    print(f"Serving {args.source} at http://{args.host}:{args.port}/stream.mjpg")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    server.hub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# telemetry_bus.py
+import time
+import threading
+from collections import deque
+from PyQt5 import QtCore
+
+
+class BusSubscriber:
+    """ One consumer of the bus and how often it wants to hear about it """
+
+    def __init__(self, callback, max_hz=10.0, batch=False, max_pending=10000):
+        self.callback = callback
+        self.period = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.batch = batch  # True: callback(list of every sample since last time), else callback(latest)
+        self.pending = deque(maxlen=max_pending) if batch else None
+        self.seen = 0       # bus seq at the last delivery
+        self.last = -1e9    # perf_counter of the last delivery
+        self.delivered = 0
+        self.timer = None
+
+
+class TelemetryBus(QtCore.QObject):
+    """ Publish/subscribe hub for telemetry dicts.
+
+    Producers call publish() at whatever rate the link runs, from any thread. The
+    bus keeps one merged "latest" dict (new fields overwrite old ones) and every
+    subscriber gets it at most max_hz times a second, on the GUI thread: ten updates
+    in between a subscriber's deliveries coalesce into one call. Subscribers that must
+    see every sample (plots, recorders) ask for batch=True and get the list instead.
+    """
+
+    _wake = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._seq = 0
+        self._subs = ()  # copy-on-write, publish() iterates it without the GUI thread
+        self._wake_pending = False
+        self.published = 0
+        self._wake.connect(self._dispatch, QtCore.Qt.QueuedConnection)
+
+    # ---------------- Producers (any thread) ----------------
+    def publish(self, telemetry):
+        with self._lock:
+            self._latest = {**self._latest, **telemetry}  # fresh dict, subscribers may keep the old one
+            self._seq += 1
+            self.published += 1
+            for sub in self._subs:
+                if sub.batch:
+                    sub.pending.append(telemetry)
+            wake = not self._wake_pending
+            self._wake_pending = True
+        if wake:
+            self._wake.emit()  # one queued wake-up per event loop turn, not one per sample
+
+    def latest(self):
+        return self._latest
+
+    def clear_pending(self):
+        """ Drop samples not yet delivered to batch subscribers (the stream jumped, e.g. a replay seek) """
+        with self._lock:
+            for sub in self._subs:
+                if sub.batch:
+                    sub.pending.clear()
+
+    # ---------------- Subscribers (GUI thread) ----------------
+    def subscribe(self, callback, max_hz=10.0, batch=False):
+        """ callback(latest dict) at most max_hz times a second (0 = every event loop turn) """
+        sub = BusSubscriber(callback, max_hz, batch)
+        sub.timer = QtCore.QTimer(self)
+        sub.timer.setSingleShot(True)
+        sub.timer.timeout.connect(lambda: self._deliver(sub))
+        with self._lock:
+            sub.seen = self._seq
+            self._subs = self._subs + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subs = tuple(s for s in self._subs if s is not sub)
+        sub.timer.stop()
+        sub.timer.deleteLater()
+
+    def stats(self):
+        """ published count and deliveries per subscriber callback """
+        return {"published": self.published,
+                "delivered": {getattr(s.callback, "__qualname__", repr(s.callback)): s.delivered for s in self._subs}}
+
+    def _dispatch(self):
+        with self._lock:
+            self._wake_pending = False
+            seq = self._seq
+        now = time.perf_counter()
+        for sub in self._subs:
+            if sub.seen == seq or sub.timer.isActive():
+                continue  # nothing new, or a delivery is already scheduled and will pick this up
+            wait = sub.last + sub.period - now
+            if wait > 0:
+                sub.timer.start(int(wait * 1000) + 1)
+            else:
+                self._deliver(sub)
+
+    def _deliver(self, sub):
+        with self._lock:
+            if sub not in self._subs:
+                return  # unsubscribed while its timer was pending
+            latest, sub.seen = self._latest, self._seq
+            if sub.batch:
+                items = list(sub.pending)
+                sub.pending.clear()
+        sub.last = time.perf_counter()
+        sub.delivered += 1
+        sub.callback(items if sub.batch else latest)
+
+
+# one bus for the whole app, like the video source registry
+bus = TelemetryBus()
@@ -0,0 +1,112 @@
+# telemetry_replay.py
+import time
+import numpy as np
+from PyQt5 import QtCore
+
+from telemetry_store import TelemetrySession
+
+# 0 = as fast as the GUI can take it
+REPLAY_SPEEDS = {"1x": 1.0, "10x": 10.0, "100x": 100.0, "max": 0.0}
+
+
+class TelemetryReplay(QtCore.QObject):
+    """ Plays a recorded telemetry session back as the same dicts the live link produces.
+
+    A GUI-thread timer works out which records are due at the current speed and emits
+    each as sample(dict), so consumers cannot tell replay from live. At most max_batch
+    records go out per tick; when a tick hits that cap the clock is re-anchored, which
+    slows replay down instead of letting the backlog snowball. Seeking uses the
+    session's time index.
+    """
+
+    sample = QtCore.pyqtSignal(dict)
+    seeked = QtCore.pyqtSignal(float)            # before the first sample after a seek: consumers start over
+    position_changed = QtCore.pyqtSignal(float)  # seconds since session start, once per tick
+    finished = QtCore.pyqtSignal()
+
+    def __init__(self, session, speed=1.0, tick_ms=15, max_batch=256, parent=None):
+        super().__init__(parent)
+        self.session = session if isinstance(session, TelemetrySession) else TelemetrySession(session)
+        self.speed = speed
+        self.tick_ms = tick_ms
+        self.max_batch = max_batch
+        self._t = self.session.column("t")
+        self._i = 0  # next record to emit
+        self._wall0 = 0.0
+        self._media0 = 0.0
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self._tick)
+
+    # ---------------- Info ----------------
+    @property
+    def start_t(self):
+        return float(self._t[0]) if len(self._t) else 0.0
+
+    @property
+    def duration(self):
+        return float(self._t[-1]) - self.start_t if len(self._t) else 0.0
+
+    @property
+    def position(self):
+        """ Seconds since session start of the last emitted record """
+        if not len(self._t):
+            return 0.0
+        return float(self._t[max(self._i - 1, 0)]) - self.start_t
+
+    def is_playing(self):
+        return self._timer.isActive()
+
+    # ---------------- Control ----------------
+    def play(self):
+        if self._i >= len(self._t):
+            self._i = 0  # replay again from the top
+        self._anchor()
+        self._timer.start(0 if self.speed <= 0 else self.tick_ms)
+
+    def pause(self):
+        self._timer.stop()
+
+    def set_speed(self, speed):
+        self.speed = speed
+        if self.is_playing():
+            self.play()  # re-anchor at the new rate
+
+    def seek(self, seconds):
+        """ Jump to seconds since session start and show the record there right away """
+        if not len(self._t):
+            return
+        i = self.session.index_at(self.start_t + seconds)
+        self.seeked.emit(float(self._t[i]) - self.start_t)
+        self._emit(i, i + 1)
+        self._i = i + 1
+        self._anchor()
+        self.position_changed.emit(self.position)
+
+    # ---------------- Timer ----------------
+    def _anchor(self):
+        self._wall0 = time.perf_counter()
+        self._media0 = float(self._t[self._i]) if self._i < len(self._t) else 0.0
+
+    def _tick(self):
+        n = len(self._t)
+        stop = n
+        if self.speed > 0:
+            due = self._media0 + (time.perf_counter() - self._wall0) * self.speed
+            stop = int(np.searchsorted(self._t, due, side="right"))
+        capped = stop - self._i > self.max_batch
+        stop = min(stop, self._i + self.max_batch)
+        if stop > self._i:
+            self._emit(self._i, stop)
+            self._i = stop
+            if capped and self.speed > 0:
+                self._anchor()  # consumers cannot keep up: slow down rather than burst
+            self.position_changed.emit(self.position)
+        if self._i >= n:
+            self.pause()
+            self.finished.emit()
+
+    def _emit(self, start, stop):
+        rows = self.session.read(start, stop)
+        names = rows.dtype.names
+        for row in rows.tolist():
+            self.sample.emit(dict(zip(names, row)))
@@ -0,0 +1,201 @@
+# telemetry_store.py
+"""
+Binary telemetry recording.
+
+Every sample is one fixed-size record of a numpy structured dtype. Records are
+appended to chunk files inside a session directory:
+  telemetry/<name>_<YYYYmmdd_HHMMSS>/
+    meta.json          dtype description, chunk size, start time
+    chunk_00000.tlm    raw little-endian records, nothing else
+    chunk_00001.tlm    ...
+A reader memory-maps the chunks, so a column over millions of samples is a numpy
+view straight off the page cache: no parsing, no per-row Python.
+"""
+
+import os
+import json
+import time
+import glob
+
+import numpy as np
+
+TELEMETRY_DIR = os.getenv("GCS_TELEMETRY_DIR", "telemetry")
+
+# t is time.time() of the sample; the rest mirror the telemetry dict built by MainWindow.
+# align=True pads records to a multiple of 8 bytes, so t stays aligned in the memmap
+# (searchsorted on a misaligned column copies the whole column first)
+TELEMETRY_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("battery", "<f4"),
+    ("speed", "<f4"),
+    ("distance", "<f4"),
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("temp", "<f4"),
+    # actuator feedback; sessions recorded before these existed simply do not have them
+    ("servo", "<f4"),
+    ("pan", "<f4"),
+    ("tilt", "<f4"),
+], align=True)
+
+CHUNK_SUFFIX = ".tlm"
+
+
+def session_path(name="rover"):
+    """ telemetry/<name>_<YYYYmmdd_HHMMSS> (parent directory created on demand) """
+    os.makedirs(TELEMETRY_DIR, exist_ok=True)
+    return os.path.join(TELEMETRY_DIR, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+
+
+def _dtype_from_descr(descr):
+    # unnamed entries are padding: keep the record layout, not as fields
+    names, formats, offsets, size = [], [], [], 0
+    for name, fmt, *shape in descr:
+        dt = np.dtype((fmt, tuple(shape[0])) if shape else fmt)
+        if name:
+            names.append(name)
+            formats.append(dt)
+            offsets.append(size)
+        size += dt.itemsize
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": size})
+
+
+class TelemetryRecorder:
+    """ Append-only writer for one session.
+
+    Samples go into a preallocated numpy block and hit the disk as one write when the
+    block is full or flush_s has passed, so recording costs a row assignment per sample.
+    A new chunk file starts every chunk_records records.
+    """
+
+    def __init__(self, path, dtype=TELEMETRY_DTYPE, chunk_records=1 << 20, buffer_records=4096, flush_s=1.0):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self._fields = self.dtype.names[1:]  # everything after t
+        self.chunk_records = chunk_records
+        self.flush_s = flush_s
+        self._buf = np.zeros(buffer_records, dtype=self.dtype)
+        self._n = 0  # records waiting in _buf
+        self._file = None
+        self._chunk = -1
+        self._in_chunk = 0  # records already in the open chunk file
+        self._last_flush = time.monotonic()
+        self.count = 0
+
+        os.makedirs(path, exist_ok=True)
+        meta = {"dtype": self.dtype.descr, "chunk_records": chunk_records, "start": time.time()}
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    def record(self, telemetry, t=None):
+        """ Append one telemetry dict (missing fields are stored as 0) """
+        get = telemetry.get
+        self._buf[self._n] = (time.time() if t is None else t,) + tuple(get(name, 0) for name in self._fields)
+        self._n += 1
+        self.count += 1
+        if self._n == len(self._buf) or time.monotonic() - self._last_flush >= self.flush_s:
+            self.flush()
+
+    def extend(self, records):
+        """ Append a structured array of samples in one go """
+        records = np.asarray(records, dtype=self.dtype)
+        self.flush()
+        self._write(records)
+        self.count += len(records)
+
+    def flush(self):
+        if self._n:
+            self._write(self._buf[:self._n])
+            self._n = 0
+        if self._file is not None:
+            self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, records):
+        while len(records):
+            if self._file is None or self._in_chunk >= self.chunk_records:
+                if self._file is not None:
+                    self._file.close()
+                self._chunk += 1
+                self._in_chunk = 0
+                self._file = open(os.path.join(self.path, f"chunk_{self._chunk:05d}{CHUNK_SUFFIX}"), "wb")
+            take = records[:self.chunk_records - self._in_chunk]
+            self._file.write(take.tobytes())
+            self._in_chunk += len(take)
+            records = records[len(take):]
+
+
+class TelemetrySession:
+    """ Read-only view of a recorded session, memory-mapped chunk by chunk.
+
+    Works on a session that is still being recorded: refresh() picks up new records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.dtype = _dtype_from_descr(self.meta["dtype"])
+        self.chunks = []
+        self._starts = np.zeros(1, dtype=np.int64)  # record offset of each chunk, plus the total
+        self.refresh()
+
+    def refresh(self):
+        self.chunks = []
+        for name in sorted(glob.glob(os.path.join(self.path, "*" + CHUNK_SUFFIX))):
+            n = os.path.getsize(name) // self.dtype.itemsize  # a half-written tail record is ignored
+            if n:
+                self.chunks.append(np.memmap(name, dtype=self.dtype, mode="r", shape=(n,)))
+        self._starts = np.concatenate(([0], np.cumsum([len(c) for c in self.chunks]))).astype(np.int64)
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    @property
+    def names(self):
+        return self.dtype.names
+
+    def __getitem__(self, key):
+        """ session[i] -> one record, session[a:b] -> structured array (a view when it fits in one chunk) """
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            return self.read(start, stop)[::step]
+        if key < 0:
+            key += len(self)
+        c = int(np.searchsorted(self._starts, key, side="right") - 1)
+        return self.chunks[c][key - self._starts[c]]
+
+    def read(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return np.zeros(0, dtype=self.dtype)
+        parts = []
+        for chunk, c0 in zip(self.chunks, self._starts):
+            lo, hi = max(start - c0, 0), min(stop - c0, len(chunk))
+            if lo < hi:
+                parts.append(chunk[lo:hi])
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def column(self, name):
+        """ One field over the whole session (a memmap view for single-chunk sessions) """
+        if len(self.chunks) == 1:
+            return self.chunks[0][name]
+        return np.concatenate([c[name] for c in self.chunks]) if self.chunks else np.zeros(0, self.dtype[name])
+
+    def index_at(self, t):
+        """ Index of the last record at or before time t (timestamps are non-decreasing) """
+        if not len(self):
+            return 0
+        firsts = np.array([c["t"][0] for c in self.chunks])
+        c = max(int(np.searchsorted(firsts, t, side="right")) - 1, 0)
+        i = int(np.searchsorted(self.chunks[c]["t"], t, side="right")) - 1
+        return max(int(self._starts[c]) + i, 0)
+
+    def close(self):
+        self.chunks = []
@@ -0,0 +1,366 @@
+# tile_server.py
+"""
+Local tile and asset server for the map pages.
+
+An HTTP server on 127.0.0.1 (own thread) that the map pages load everything from:
+  /tiles/{z}/{x}/{y}.png    map tiles from an MBTiles (SQLite) cache, fetched upstream on a miss
+  /cdn/<host>/<path>        Leaflet, CSS, icons... from map_assets/<host>/<path> shipped with the app,
+                            else map_cache/assets/<host>/<path>, fetched on a miss; only for hosts
+                            a localized page referenced, the server is no general proxy
+  /pages/<name>             map pages handed to publish(), so every map view shares one origin
+localize(html) rewrites a map page to point at it. Once a mission area has been
+seen (or prefetched) the maps load from disk, with or without network.
+
+The tile cache is bounded (GCS_TILE_CACHE_MB) and evicts least recently used tiles.
+Tiles imported into the MBTiles file by other tools have no LRU entry and are never
+evicted, so a prepared offline area stays put.
+
+prefetch() refuses the OpenStreetMap tile servers: their usage policy forbids bulk
+downloads. Point GCS_TILE_UPSTREAM at a provider that allows offline use to prefetch.
+
+Run:
+ python tile_server.py --bench       # cache hit latency through HTTP, eviction
+"""
+
+import os
+import re
+import sys
+import math
+import time
+import socket
+import sqlite3
+import threading
+import mimetypes
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TILE_SERVER = os.getenv("GCS_TILE_SERVER", "1") != "0"      # 0: pages keep their CDN/tile URLs
+TILE_DIR = os.getenv("GCS_TILE_DIR", "map_cache")
+MAP_ASSETS = os.getenv("GCS_MAP_ASSETS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "map_assets"))
+# fixed port keeps page, asset and tile URLs (and so the map profile's disk cache) the same across
+# restarts; only when it is taken does the server fall back to any free one
+TILE_PORT = int(os.getenv("GCS_TILE_PORT", "47615"))
+TILE_CACHE_MB = float(os.getenv("GCS_TILE_CACHE_MB", "512"))
+TILE_UPSTREAM = os.getenv("GCS_TILE_UPSTREAM", "https://tile.openstreetmap.org/{z}/{x}/{y}.png")
+TILE_OFFLINE = os.getenv("GCS_TILE_OFFLINE", "0") == "1"    # never touch the network, cache only
+NO_PREFETCH_HOSTS = ("tile.openstreetmap.org",)              # tile usage policy: no bulk downloading
+TILE_TIMEOUT = 5.0
+TOUCH_BATCH = 256               # LRU updates held back before they are committed...
+TOUCH_FLUSH_S = 5.0             # ...or after this long, so a session that only reads still keeps its recency
+PREFETCH_MAX_TILES = 20000
+USER_AGENT = "GCS-tile-cache/1.0"
+
+# a tile layer template (any host, {s} subdomains) and anything that looks like a static asset
+_TILE_URL = re.compile(r"https?://[^\s\"'<>]*\{z\}/\{x\}/\{y\}(?:\.png)?")
+_ASSET_URL = re.compile(r"https?://([A-Za-z0-9.-]+)/([^\s\"'<>\\?#]+?\.(?:js|css|png|jpe?g|gif|svg|woff2?|ttf|eot))"
+                        r"(?=[\s\"'<>\\?#])")
+
+
+def deg2tile(lat, lon, z):
+    """ Slippy map tile (x, y) containing lat/lon at zoom z """
+    n = 2 ** z
+    lat = max(min(lat, 85.0511), -85.0511)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tiles_for(bbox, zooms):
+    """ Every (z, x, y) covering bbox = (south, west, north, east) at the given zooms """
+    south, west, north, east = bbox
+    for z in zooms:
+        x0, y0 = deg2tile(north, west, z)
+        x1, y1 = deg2tile(south, east, z)
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                yield z, x, y
+
+
+class TileCache:
+    """ MBTiles file plus an LRU side table, safe to use from the server threads """
+
+    def __init__(self, path, max_bytes):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,
+                                              tile_data BLOB, PRIMARY KEY (zoom_level, tile_column, tile_row));
+            CREATE TABLE IF NOT EXISTS tile_lru (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER,
+                                                 last_used REAL, size INTEGER,
+                                                 PRIMARY KEY (zoom_level, tile_column, tile_row));
+            CREATE INDEX IF NOT EXISTS tile_lru_used ON tile_lru (last_used);
+            INSERT OR IGNORE INTO metadata VALUES ('name', 'gcs tile cache'), ('format', 'png');
+        """)
+        self.bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM tile_lru").fetchone()[0]
+        self._touched = {}  # key -> last use, written back in batches instead of one UPDATE per hit
+        self._touched_at = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @staticmethod
+    def _key(z, x, y):
+        return z, x, (2 ** z - 1) - y  # MBTiles rows count from the south (TMS)
+
+    def get(self, z, x, y):
+        key = self._key(z, x, y)
+        with self._lock:
+            row = self._db.execute("SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                   key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            now = self._touched[key] = time.time()
+            if len(self._touched) >= TOUCH_BATCH or now - self._touched_at >= TOUCH_FLUSH_S:
+                self._write_touched()
+                self._db.commit()
+            return row[0]
+
+    def has(self, z, x, y):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                    self._key(z, x, y)).fetchone() is not None
+
+    def put(self, z, x, y, data):
+        key = self._key(z, x, y)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM tile_lru WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                                   key).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", key + (sqlite3.Binary(data),))
+            self._db.execute("INSERT OR REPLACE INTO tile_lru VALUES (?, ?, ?, ?, ?)", key + (time.time(), len(data)))
+            self.bytes += len(data) - (old[0] if old else 0)
+            if self.bytes > self.max_bytes:
+                self._write_touched()
+                self._evict()
+            self._db.commit()
+
+    def _write_touched(self):
+        self._db.executemany("UPDATE tile_lru SET last_used=? WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+                             [(t,) + key for key, t in self._touched.items()])
+        self._touched.clear()
+        self._touched_at = time.time()
+
+    def _evict(self):
+        # down to 90 % so a full cache does not evict on every single put
+        target = 0.9 * self.max_bytes
+        while self.bytes > target:
+            rows = self._db.execute("SELECT zoom_level, tile_column, tile_row, size FROM tile_lru "
+                                    "ORDER BY last_used LIMIT 256").fetchall()
+            if not rows:
+                break
+            keys = []
+            for *key, size in rows:
+                keys.append(key)
+                self.bytes -= size
+                if self.bytes <= target:
+                    break
+            self._db.executemany("DELETE FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?", keys)
+            self._db.executemany("DELETE FROM tile_lru WHERE zoom_level=? AND tile_column=? AND tile_row=?", keys)
+            self.evicted += len(keys)
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._db.commit()
+            self._db.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        srv = self.server.tiles
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        body, ctype, cache = None, None, "max-age=86400"  # let the browser cache keep tiles and assets too
+        try:
+            if len(parts) == 2 and parts[0] == "pages":
+                body, ctype, cache = srv.pages.get(parts[1]), "text/html; charset=utf-8", "no-store"
+            elif len(parts) == 4 and parts[0] == "tiles":
+                z, x, y = int(parts[1]), int(parts[2]), int(parts[3].split(".")[0])
+                body, ctype = srv.tile(z, x, y), "image/png"
+            elif len(parts) >= 3 and parts[0] == "cdn":
+                body = srv.asset(parts[1], "/".join(parts[2:]))
+                ctype = mimetypes.guess_type(parts[-1])[0] or "application/octet-stream"
+        except ValueError:
+            pass
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        pass  # a map load is hundreds of requests
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    # the fixed port only works if a second GCS cannot bind it too: on Windows SO_REUSEADDR
+    # allows exactly that, so bind exclusively there and let the taken port fail over
+    allow_reuse_address = sys.platform != "win32"
+
+    def server_bind(self):
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+
+class TileServer:
+    """ Tile + asset cache behind an HTTP server on localhost, started on first use """
+
+    def __init__(self, directory=TILE_DIR, max_mb=TILE_CACHE_MB, upstream=TILE_UPSTREAM, offline=TILE_OFFLINE,
+                 port=TILE_PORT):
+        self.directory = directory
+        self.port = port
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.upstream = upstream
+        self.offline = offline
+        self.cache = None
+        self.pages = {}  # name -> html bytes
+        self.asset_hosts = set()  # hosts /cdn serves, the ones localize() has rewritten
+        self.url = None
+        self._httpd = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """ Base URL of the server (starts it the first time) """
+        with self._lock:
+            if self._httpd is None:
+                self.cache = TileCache(os.path.join(self.directory, "tiles.mbtiles"), self.max_bytes)
+                try:
+                    self._httpd = _HTTPServer(("127.0.0.1", self.port), _Handler)
+                except OSError:
+                    self._httpd = _HTTPServer(("127.0.0.1", 0), _Handler)  # port taken: any free one
+                self._httpd.daemon_threads = True
+                self._httpd.tiles = self
+                self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+                threading.Thread(target=self._httpd.serve_forever, name="tile-server", daemon=True).start()
+            return self.url
+
+    def stop(self):
+        with self._lock:
+            if self._httpd is not None:
+                self._httpd.shutdown()
+                self._httpd.server_close()
+                self._httpd = None
+                self.cache.close()
+
+    # ---------------- Content ----------------
+    def _fetch(self, url):
+        if self.offline:
+            return None
+        try:
+            req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+            with urllib.request.urlopen(req, timeout=TILE_TIMEOUT) as resp:
+                return resp.read()
+        except (OSError, ValueError):
+            return None  # offline or upstream trouble: the page shows a blank tile / misses one asset
+
+    def tile(self, z, x, y):
+        data = self.cache.get(z, x, y)
+        if data is None:
+            data = self._fetch(self.upstream.format(z=z, x=x, y=y, s="a"))
+            if data:
+                self.cache.put(z, x, y, data)
+        return data
+
+    def asset(self, host, path):
+        if host not in self.asset_hosts:
+            return None
+        for root in (os.path.abspath(MAP_ASSETS), os.path.abspath(os.path.join(self.directory, "assets"))):
+            local = os.path.abspath(os.path.join(root, host, path))
+            if not local.startswith(root + os.sep):
+                return None  # no ../ out of the asset directories
+            if os.path.exists(local):
+                with open(local, "rb") as f:
+                    return f.read()
+        data = self._fetch(f"https://{host}/{path}")
+        if data:  # into the cache, the last of the roots above
+            os.makedirs(os.path.dirname(local), exist_ok=True)
+            with open(local + ".part", "wb") as f:
+                f.write(data)
+            os.replace(local + ".part", local)
+        return data
+
+    def publish(self, name, html):
+        """ Serve a (localized) page at /pages/<name>; returns its URL """
+        base = self.start()
+        self.pages[name] = html.encode("utf-8")
+        return f"{base}/pages/{name}"
+
+    def localize(self, html):
+        """ html with tile layers and CDN assets pointed at this server """
+        if not TILE_SERVER:
+            return html
+        base = self.start()
+        html = _TILE_URL.sub(base + "/tiles/{z}/{x}/{y}.png", html)
+
+        def to_local(m):
+            self.asset_hosts.add(m.group(1))
+            return f"{base}/cdn/{m.group(1)}/{m.group(2)}"
+        return _ASSET_URL.sub(to_local, html)
+
+    # ---------------- Prefetch ----------------
+    def prefetch(self, bbox, zooms=range(12, 18), on_progress=None):
+        """ Fetch every missing tile of bbox = (south, west, north, east) in the background.
+
+        on_progress(done, total) is called from the prefetch thread. Returns the number of
+        tiles in the area; raises ValueError if that is more than PREFETCH_MAX_TILES or the
+        upstream does not allow bulk downloads.
+        """
+        host = urllib.parse.urlsplit(self.upstream).hostname or ""
+        if any(host == h or host.endswith("." + h) for h in NO_PREFETCH_HOSTS):
+            raise ValueError(f"{host} does not allow bulk downloads (tile usage policy): "
+                             f"set GCS_TILE_UPSTREAM to a provider that permits prefetching")
+        self.start()
+        todo = list(tiles_for(bbox, zooms))
+        if len(todo) > PREFETCH_MAX_TILES:
+            raise ValueError(f"{len(todo)} tiles, more than {PREFETCH_MAX_TILES}: use a smaller area or fewer zooms")
+
+        def run():
+            for i, (z, x, y) in enumerate(todo, 1):
+                if not self.cache.has(z, x, y):
+                    self.tile(z, x, y)
+                if on_progress is not None and (i % 50 == 0 or i == len(todo)):
+                    on_progress(i, len(todo))
+        threading.Thread(target=run, name="tile-prefetch", daemon=True).start()
+        return len(todo)
+
+
+# one server for every map page in the app
+server = TileServer()
+
+
+def main():
+    if "--bench" not in sys.argv:
+        print(__doc__)
+        return
+    import tempfile
+    with tempfile.TemporaryDirectory() as d:
+        srv = TileServer(directory=d, max_mb=8, offline=True)
+        base = srv.start()
+        tile = os.urandom(20_000)  # about an OSM tile
+        for z, x, y in tiles_for((28.55, 77.15, 28.65, 77.25), range(12, 17)):
+            srv.cache.put(z, x, y, tile)
+        keys = list(tiles_for((28.55, 77.15, 28.65, 77.25), range(12, 17)))
+        print(f"{len(keys)} tiles put, {srv.cache.bytes / 1e6:.1f} MB kept (cap 8 MB), {srv.cache.evicted} evicted")
+        kept = [k for k in keys if srv.cache.has(*k)]
+        t0 = time.perf_counter()
+        for z, x, y in kept[:300]:
+            urllib.request.urlopen(f"{base}/tiles/{z}/{x}/{y}.png").read()
+        dt = (time.perf_counter() - t0) * 1000.0 / min(len(kept), 300)
+        print(f"cache hit over HTTP: {dt:.2f} ms/tile")
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# video_index.py
+"""
+Keyframe / timestamp index for recorded video, for fast and exact seeking.
+
+The file is scanned once in OpenCV's raw packet mode (CAP_PROP_FORMAT = -1): packets
+are read but never decoded, so indexing a long recording takes milliseconds. The
+index is saved next to the video as <video>.keyidx.npz:
+  pts_ms     presentation time of every frame, in display order
+  keyframes  display-order numbers of the frames a decoder can start from
+
+A seek maps the timestamp to the exact frame, then uses the keyframe table to pick
+the cheaper of two ways to get there: decode forward from where the reader already
+is (typical while scrubbing forward), or let OpenCV restart the decoder. OpenCV's
+seek always backs up OPENCV_SEEK_BACKOFF frames before looking for a keyframe, so
+the index tells us exactly how many frames that restart will decode.
+
+Run:
+ python video_index.py vid.mp4 [--bench]
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+INDEX_SUFFIX = ".keyidx.npz"
+OPENCV_SEEK_BACKOFF = 16  # cap_ffmpeg seeks to (frame - 16) with AVSEEK_FLAG_BACKWARD
+
+
+class VideoIndex:
+    def __init__(self, pts_ms, keyframes, fps=0.0):
+        self.pts_ms = np.asarray(pts_ms, dtype=np.float64)
+        self.keyframes = np.asarray(keyframes, dtype=np.int64)
+        self.fps = fps
+
+    def __len__(self):
+        return len(self.pts_ms)
+
+    @property
+    def duration_ms(self):
+        return float(self.pts_ms[-1]) if len(self.pts_ms) else 0.0
+
+    def frame_at(self, ms):
+        """ Display-order frame showing at time ms """
+        return int(np.clip(np.searchsorted(self.pts_ms, ms, side="right") - 1, 0, len(self.pts_ms) - 1))
+
+    def keyframe_before(self, frame):
+        i = np.searchsorted(self.keyframes, frame, side="right") - 1
+        return int(self.keyframes[max(i, 0)])
+
+    # ---------------- Build / persist ----------------
+    @classmethod
+    def build(cls, path):
+        cap = cv2.VideoCapture(path)
+        if not cap.isOpened():
+            raise IOError(f"cannot open {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        if not cap.set(cv2.CAP_PROP_FORMAT, -1):
+            cap.release()
+            raise IOError("this OpenCV build cannot read raw packets")
+        pts, key = [], []
+        while cap.grab():
+            pts.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+            key.append(bool(cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME)))
+        cap.release()
+
+        # packets come in decode order; B-frames make that differ from display order
+        pts = np.asarray(pts, dtype=np.float64)
+        order = np.argsort(pts, kind="stable")
+        display_no = np.empty_like(order)
+        display_no[order] = np.arange(len(order))
+        keyframes = np.sort(display_no[np.asarray(key, dtype=bool)])
+        if not len(keyframes) or keyframes[0] != 0:
+            keyframes = np.concatenate(([0], keyframes))  # a stream always starts decodable
+        return cls(pts[order], keyframes, fps)
+
+    def save(self, path, video_path):
+        st = os.stat(video_path)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, pts_ms=self.pts_ms, keyframes=self.keyframes, fps=self.fps,
+                                video_size=st.st_size, video_mtime=st.st_mtime)
+
+    @classmethod
+    def load(cls, path, video_path):
+        """ The saved index, or None when missing or stale (video changed since) """
+        try:
+            data = np.load(path)
+        except (OSError, ValueError):
+            return None
+        st = os.stat(video_path)
+        if int(data["video_size"]) != st.st_size or float(data["video_mtime"]) != st.st_mtime:
+            return None
+        return cls(data["pts_ms"], data["keyframes"], float(data["fps"]))
+
+
+def index_for(video_path):
+    """ Load the sidecar index, building and saving it on first use """
+    idx_path = video_path + INDEX_SUFFIX
+    index = VideoIndex.load(idx_path, video_path)
+    if index is None:
+        index = VideoIndex.build(video_path)
+        try:
+            index.save(idx_path, video_path)
+        except OSError:
+            pass  # read-only media: keep the index in memory only
+    return index
+
+
+def seek(cap, index, ms):
+    """ Position cap so the next read() returns the frame showing at ms; returns that frame number """
+    target = index.frame_at(ms)
+    pos = int(cap.get(cv2.CAP_PROP_POS_FRAMES))  # frame the next read() would return
+    forward_cost = target - pos if pos <= target else None
+    restart_cost = target - index.keyframe_before(max(target - OPENCV_SEEK_BACKOFF, 0))
+    if forward_cost is None or forward_cost > restart_cost:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, target)
+        return target
+    for _ in range(forward_cost):
+        if not cap.grab():  # decode only, skip the colour conversion
+            break
+    return target
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    path = sys.argv[1]
+    t0 = time.perf_counter()
+    index = VideoIndex.build(path)
+    build_ms = (time.perf_counter() - t0) * 1000.0
+    index.save(path + INDEX_SUFFIX, path)
+    print(f"{path}: {len(index)} frames, {len(index.keyframes)} keyframes, "
+          f"{index.duration_ms / 1000.0:.1f} s, indexed in {build_ms:.1f} ms")
+
+    if "--bench" in sys.argv:
+        # scrubbing: mostly small steps forward, now and then a jump anywhere
+        rng = np.random.default_rng(0)
+        steps = np.where(rng.random(60) < 0.15, rng.uniform(-index.duration_ms, index.duration_ms, 60),
+                         rng.uniform(20, 300, 60))
+        targets = np.mod(np.cumsum(steps), index.duration_ms)
+        cap = cv2.VideoCapture(path)
+        for name, fn in (("POS_FRAMES", lambda ms: cap.set(cv2.CAP_PROP_POS_FRAMES, index.frame_at(ms))),
+                         ("keyframe index", lambda ms: seek(cap, index, ms))):
+            errors, t0 = [], time.perf_counter()
+            for ms in targets:
+                fn(ms)
+                cap.read()
+                errors.append(abs(cap.get(cv2.CAP_PROP_POS_MSEC) - index.pts_ms[index.frame_at(ms)]))
+            dt = (time.perf_counter() - t0) * 1000.0 / len(targets)
+            print(f"{name:>15}: {dt:7.2f} ms/seek, max error {max(errors):.1f} ms")
+        cap.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# video_process.py
+"""
+Out-of-process video decode.
+
+Each source gets its own worker process that decodes and converts frames to RGB,
+then writes them into a ring of slots in multiprocessing.shared_memory. The GUI
+process maps the same block and reads frames in place: no pickling, no copies
+through pipes. Only the frame shape and the block name go through the pipe, once.
+"""
+
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from video_source import open_source
+
+HEADER_FIELDS = 7  # seq, decode time (us), width, height, drift (us), max drift (us), skipped
+
+
+class ShmFrameRing:
+    """ Latest-frame-wins ring in one shared memory block (single writer process) """
+
+    def __init__(self, shape, slots=4, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        frame_bytes = int(np.prod(self.shape))
+        size = HEADER_FIELDS * 8 + slots * 8 + slots * frame_bytes
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = _attach(name)
+            self.owner = False
+        buf = self.shm.buf
+        self._header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        self._stamps = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=HEADER_FIELDS * 8)
+        self._frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=buf,
+                                  offset=HEADER_FIELDS * 8 + slots * 8)
+        if self.owner:
+            self._header[:] = 0
+            self._header[2], self._header[3] = self.shape[1], self.shape[0]
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def seq(self):
+        return int(self._header[0])
+
+    @property
+    def decode_ms(self):
+        return self._header[1] / 1000.0
+
+    # ---------------- Writer (decode process) ----------------
+    def write_slot(self):
+        return self._frames[(int(self._header[0]) + 1) % self.slots]
+
+    def publish(self, timestamp, decode_s=0.0):
+        nxt = int(self._header[0]) + 1
+        self._stamps[nxt % self.slots] = timestamp
+        self._header[1] = int(decode_s * 1e6)
+        self._header[0] = nxt  # aligned 8-byte store, readers never see a torn value
+
+    def set_source_stats(self, stats):
+        if stats:
+            self._header[4] = int(stats.get("drift_ms", 0.0) * 1000)
+            self._header[5] = int(stats.get("max_drift_ms", 0.0) * 1000)
+            self._header[6] = stats.get("skipped", 0)
+
+    # ---------------- Reader (GUI process) ----------------
+    def latest(self, last_seq=0):
+        """ Same contract as FrameRingBuffer.latest: a view into shared memory, check is_fresh after use """
+        seq = int(self._header[0])
+        if seq == 0 or seq == last_seq:
+            return None
+        idx = seq % self.slots
+        return seq, float(self._stamps[idx]), self._frames[idx]
+
+    def is_fresh(self, seq):
+        return int(self._header[0]) - seq < self.slots - 1
+
+    def source_stats(self):
+        if not self._header[4] and not self._header[5] and not self._header[6]:
+            return {}
+        return {"drift_ms": self._header[4] / 1000.0, "max_drift_ms": self._header[5] / 1000.0,
+                "skipped": int(self._header[6])}
+
+    def close(self):
+        # drop our numpy views first, the buffer cannot be released while they exist
+        self._header = self._stamps = self._frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _attach(name):
+    # the creating (GUI) process owns the block and unlinks it; spawned children share its
+    # resource tracker, so attaching here must not unregister the name again
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _decode_main(source, slots, conn, stop_event, new_frame, seek_ms):
+    """ Worker process entry point """
+    src = open_source(source)
+    ret, frame = src.read() if src.open() else (False, None)
+    if not ret:
+        conn.send(None)
+        src.release()
+        return
+    conn.send(frame.shape)
+    name = conn.recv()
+    ring = ShmFrameRing(frame.shape, slots=slots, name=name)
+
+    try:
+        t0 = time.perf_counter()
+        while not stop_event.is_set():
+            if seek_ms.value >= 0:
+                with seek_ms.get_lock():
+                    ms, seek_ms.value = seek_ms.value, -1.0
+                src.seek(ms)
+                ret = False  # the frame in hand is from before the jump
+            if ret:
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=ring.write_slot())
+                ring.set_source_stats(src.stats())
+                ring.publish(time.monotonic(), time.perf_counter() - t0)
+                new_frame.set()
+            else:
+                time.sleep(0.01)
+            src.pace()  # files and synthetic feeds wait for their next frame time here
+            t0 = time.perf_counter()
+            ret, frame = src.read()
+    finally:
+        src.release()
+        ring.close()
+
+
+class DecodeProcess:
+    """ Parent-side handle of one decode worker process and its shared memory ring """
+
+    def __init__(self, source, slots=4):
+        self.source = source  # URI, see video_source.open_source
+        self.slots = slots
+        self.ring = None
+        self._proc = None
+        ctx = mp.get_context("spawn")  # never fork a process that already runs Qt
+        self._ctx = ctx
+        self._stop = ctx.Event()
+        self.new_frame = ctx.Event()
+        self._seek_ms = ctx.Value("d", -1.0)  # pending seek for the worker, -1 = none
+
+    def start(self, timeout=10.0):
+        """ Launch the worker and map its ring; returns False if the source could not be opened """
+        parent_conn, child_conn = self._ctx.Pipe()
+        self._proc = self._ctx.Process(
+            target=_decode_main, daemon=True,
+            args=(self.source, self.slots, child_conn, self._stop, self.new_frame, self._seek_ms))
+        self._proc.start()
+        if not parent_conn.poll(timeout):
+            self.stop()
+            return False
+        shape = parent_conn.recv()
+        if shape is None:
+            self.stop()
+            return False
+        self.ring = ShmFrameRing(shape, slots=self.slots)
+        parent_conn.send(self.ring.name)
+        return True
+
+    def wait_frame(self, timeout):
+        """ Block (without holding the GIL) until the worker publishes a frame """
+        if self.new_frame.wait(timeout):
+            self.new_frame.clear()
+            return True
+        return False
+
+    def seek(self, ms):
+        """ Ask the worker to jump to ms; applied before its next frame """
+        self._seek_ms.value = max(0.0, ms)
+
+    def stop(self):
+        self._stop.set()
+        if self._proc is not None:
+            self._proc.join(timeout=2.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+            self._proc = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
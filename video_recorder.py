@@ -0,0 +1,111 @@
+# video_recorder.py
+import os
+import csv
+import time
+import queue
+import threading
+import cv2
+import numpy as np
+
+RECORDINGS_DIR = os.getenv("GCS_RECORDINGS_DIR", "recordings")
+
+
+def recording_path(name, ext=".mp4"):
+    """ recordings/<name>_<YYYYmmdd_HHMMSS>.mp4 (directory created on demand) """
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    safe = "".join(c if c.isalnum() else "_" for c in name).strip("_") or "camera"
+    return os.path.join(RECORDINGS_DIR, f"{safe}_{time.strftime('%Y%m%d_%H%M%S')}{ext}")
+
+
+class VideoRecorder:
+    """ Records frames without ever blocking the live view.
+
+    submit() is called from the capture thread and only copies the frame into a
+    bounded queue; a writer thread drains it into cv2.VideoWriter. When the disk
+    cannot keep up the queue fills and frames are dropped by policy:
+      "newest" - refuse incoming frames (keeps the recording contiguous up to the stall)
+      "oldest" - evict the oldest queued frame (keeps the recording close to live)
+    Next to the video a sidecar <video>.idx.csv lists, for every written frame, its
+    capture time (wall clock and monotonic), so the recording can be lined up with
+    telemetry afterwards. Dropped frames simply have no row.
+    """
+
+    def __init__(self, path, fps=30.0, fourcc="mp4v", max_queue=64, drop_policy="newest"):
+        if drop_policy not in ("newest", "oldest"):
+            raise ValueError(f"unknown drop policy {drop_policy!r}")
+        self.path = path
+        self.index_path = os.path.splitext(path)[0] + ".idx.csv"
+        self.fps = fps
+        self.fourcc = fourcc
+        self.drop_policy = drop_policy
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._running = False
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+
+    # ---------------- Capture thread side ----------------
+    def submit(self, frame, stamp=None, bgr=True):
+        """ Queue a frame (copied); returns False if it was dropped """
+        if not self._running:
+            return False
+        self.submitted += 1
+        if self._queue.full():
+            if self.drop_policy == "newest":
+                self.dropped += 1
+                return False
+            try:
+                self._queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+        item = (np.copy(frame), bgr, time.time(), time.monotonic() if stamp is None else stamp)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1  # lost a race with another submitter, still never block
+            return False
+        return True
+
+    # ---------------- Control ----------------
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=False):
+        """ Stop accepting frames; the writer finishes what is queued and closes the files """
+        self._running = False
+        if wait and self._thread is not None:
+            self._thread.join()
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "queued": self._queue.qsize()}
+
+    # ---------------- Writer thread ----------------
+    def _run(self):
+        writer = None
+        with open(self.index_path, "w", newline="", encoding="utf-8") as idx:
+            index = csv.writer(idx)
+            index.writerow(["frame", "wall_time", "monotonic"])
+            while True:
+                try:
+                    item = self._queue.get(timeout=0.1)
+                except queue.Empty:
+                    if not self._running:
+                        break  # stopped and drained
+                    continue
+                frame, bgr, wall, mono = item
+                if not bgr:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+                if writer is None:
+                    h, w = frame.shape[:2]
+                    writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (w, h))
+                writer.write(frame)
+                index.writerow([self.written, f"{wall:.6f}", f"{mono:.6f}"])
+                self.written += 1
+        if writer is not None:
+            writer.release()
@@ -0,0 +1,335 @@
+# video_source.py
+"""
+Video source backends behind one small interface: open() / pace() / read() / release().
+
+Sources are named by URI so they can be configured from the environment and used
+as registry keys:
+  vid.mp4, file:vid.mp4?loop=0&realtime=0    local file (loops and plays in real time by default)
+  0, device:0, /dev/video0, device:0?api=v4l2  camera device
+  synthetic:1280x720@30, synthetic:640x480@60/noise   generated test pattern
+  http://host:8081/stream.mjpg, rtsp://..., rtp://..., udp://...   network stream
+"""
+
+import os
+import sys
+import time
+from urllib.parse import parse_qs
+
+import cv2
+import numpy as np
+
+from video_index import index_for, seek
+
+DEVICE_APIS = {
+    "any": cv2.CAP_ANY,
+    "v4l2": cv2.CAP_V4L2,
+    "dshow": cv2.CAP_DSHOW,
+    "msmf": cv2.CAP_MSMF,
+}
+NETWORK_SCHEMES = ("http://", "https://", "rtsp://", "rtp://", "udp://", "tcp://")
+
+
+def default_device_api():
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    if sys.platform.startswith("win"):
+        return cv2.CAP_DSHOW  # safer on Windows
+    return cv2.CAP_ANY
+
+
+class VideoSource:
+    """ Base class: pace() waits until the next frame is due, read() returns (ok, BGR frame) """
+
+    def open(self):
+        raise NotImplementedError
+
+    def pace(self):
+        pass  # live sources block in read() instead
+
+    def read(self):
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+    def seek(self, ms):
+        return False  # only recorded media can seek
+
+    def stats(self):
+        return {}  # backend specific extras for the capture stats (e.g. playback drift)
+
+    @property
+    def fps(self):
+        return 0.0
+
+
+class CaptureSource(VideoSource):
+    """ Anything cv2.VideoCapture can open itself """
+
+    def __init__(self, target, api=None):
+        self.target = target
+        self.api = api
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.target) if self.api is None else cv2.VideoCapture(self.target, self.api)
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    @property
+    def fps(self):
+        return self.cap.get(cv2.CAP_PROP_FPS) if self.cap is not None else 0.0
+
+
+class PlaybackClock:
+    """ Maps media timestamps (ms) to wall-clock time and keeps track of how far behind we are """
+
+    def __init__(self, max_lag_ms=100.0, resync_ms=2000.0):
+        self.max_lag_ms = max_lag_ms    # later than this, frames are skipped instead of shown
+        self.resync_ms = resync_ms      # later than this (e.g. after a stall), re-anchor instead
+        self._wall0 = None
+        self._media0 = 0.0
+        self.drift_ms = 0.0             # smoothed lateness of shown frames, positive = behind
+        self.max_drift_ms = 0.0
+        self.skipped = 0
+
+    def anchor(self, media_ms):
+        self._wall0 = time.perf_counter()
+        self._media0 = media_ms
+
+    def reset(self):
+        """ Forget the anchor; the next frame re-anchors (loop restart, seek) """
+        self._wall0 = None
+
+    def lag_ms(self, media_ms):
+        """ How late the frame with this timestamp is right now (negative = early) """
+        if self._wall0 is None:
+            self.anchor(media_ms)
+        return (time.perf_counter() - self._wall0) * 1000.0 - (media_ms - self._media0)
+
+    def wait_for(self, media_ms):
+        lag = self.lag_ms(media_ms)
+        if lag < 0:
+            time.sleep(-lag / 1000.0)
+
+    def shown(self, lag):
+        self.drift_ms = 0.9 * self.drift_ms + 0.1 * lag
+        self.max_drift_ms = max(self.max_drift_ms, lag)
+
+
+class FileSource(CaptureSource):
+    """ Local video file, optionally looping and played back against its own timestamps.
+
+    In real-time mode pace() sleeps until the next frame's media time is due, and
+    read() skips (grabs without converting) frames we are already too late for, so
+    replay stays in step with the wall clock instead of drifting or bursting.
+    seek() goes through the keyframe index (video_index), built on first use.
+    """
+
+    def __init__(self, path, loop=True, realtime=True):
+        super().__init__(path)
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.clock = PlaybackClock()
+        self._next_ms = None
+        self._index = None
+
+    def _grab(self):
+        if self.cap.grab():
+            return True
+        if not self.loop:
+            return False
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.clock.reset()  # media time restarts at 0, re-anchor on the first frame
+        return self.cap.grab()
+
+    def pace(self):
+        if self.realtime and self._next_ms is not None:
+            self.clock.wait_for(self._next_ms)
+
+    def read(self):
+        if not self._grab():
+            return False, None
+        if self.realtime:
+            period = 1000.0 / (self.fps or 30.0)
+            pos = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            lag = self.clock.lag_ms(pos)
+            if lag > self.clock.resync_ms:
+                self.clock.anchor(pos)  # we were stalled for long, do not fast-forward through it
+                lag = 0.0
+            # behind: drop frames without the colour conversion until we are back on time
+            while lag > self.clock.max_lag_ms and self._grab():
+                self.clock.skipped += 1
+                pos = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+                lag = self.clock.lag_ms(pos)
+            self.clock.shown(lag)
+            self._next_ms = pos + period
+        return self.cap.retrieve()
+
+    def seek(self, ms):
+        """ Jump so the next read() returns the frame showing at ms """
+        if self._index is None:
+            try:
+                self._index = index_for(self.path)
+            except IOError:
+                return False
+        seek(self.cap, self._index, ms)
+        self.clock.reset()  # restart pacing from the new position
+        self._next_ms = None
+        return True
+
+    def stats(self):
+        return {"drift_ms": self.clock.drift_ms, "max_drift_ms": self.clock.max_drift_ms,
+                "skipped": self.clock.skipped}
+
+
+class DeviceSource(CaptureSource):
+    """ Camera device (V4L2 on Linux, DirectShow on Windows unless api says otherwise) """
+
+    def __init__(self, index, api=None, width=None, height=None, fps=None):
+        super().__init__(index, default_device_api() if api is None else api)
+        self.size = (width, height)
+        self.requested_fps = fps
+
+    def open(self):
+        if not super().open():
+            return False
+        w, h = self.size
+        if w and h:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, w)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, h)
+        if self.requested_fps:
+            self.cap.set(cv2.CAP_PROP_FPS, self.requested_fps)
+        return True
+
+
+class NetworkSource(CaptureSource):
+    """ MJPEG over HTTP or RTP/RTSP/UDP through the FFmpeg backend; reconnects when the link drops """
+
+    def __init__(self, url, reconnect_s=1.0):
+        super().__init__(url, cv2.CAP_FFMPEG)
+        self.url = url
+        self.reconnect_s = reconnect_s
+
+    def read(self):
+        ret, frame = self.cap.read() if self.cap is not None else (False, None)
+        if not ret:
+            self.release()
+            time.sleep(self.reconnect_s)
+            self.open()
+        return ret, frame
+
+
+class SyntheticSource(VideoSource):
+    """ Generated test pattern at any resolution and rate, for load tests without cameras """
+
+    def __init__(self, width=640, height=480, fps=30.0, pattern="bars"):
+        self.width, self.height = width, height
+        self._fps = fps
+        self.pattern = pattern
+        self._frame = None
+        self._base = None
+        self._count = 0
+        self._next_due = None
+
+    def open(self):
+        w, h = self.width, self.height
+        self._frame = np.empty((h, w, 3), dtype=np.uint8)
+        if self.pattern == "noise":
+            self._base = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+        else:
+            # classic colour bars
+            colors = [(192, 192, 192), (0, 192, 192), (192, 192, 0), (0, 192, 0),
+                      (192, 0, 192), (0, 0, 192), (192, 0, 0), (0, 0, 0)]
+            self._base = np.zeros((h, w, 3), dtype=np.uint8)
+            for i, c in enumerate(colors):
+                self._base[:, i * w // len(colors):(i + 1) * w // len(colors)] = c
+        self._count = 0
+        self._next_due = None
+        return True
+
+    def pace(self):
+        now = time.perf_counter()
+        if self._next_due is None:
+            self._next_due = now
+        elif self._next_due > now:
+            time.sleep(self._next_due - now)
+        self._next_due = max(self._next_due + 1.0 / self._fps, now - 1.0)
+
+    def read(self):
+        w, h = self.width, self.height
+        frame = self._frame
+        if self.pattern == "noise":
+            np.copyto(frame, np.roll(self._base, self._count * 7, axis=1))
+        else:
+            np.copyto(frame, self._base)
+        # moving box and frame counter so stalls and drops are visible
+        size = max(8, h // 8)
+        x = (self._count * 4) % max(1, w - size)
+        cv2.rectangle(frame, (x, h // 2 - size // 2), (x + size, h // 2 + size // 2), (255, 255, 255), -1)
+        cv2.putText(frame, f"{self._count:06d}", (10, max(20, h // 12)), cv2.FONT_HERSHEY_SIMPLEX,
+                    max(0.5, h / 480.0), (255, 255, 255), 2)
+        self._count += 1
+        return True, frame
+
+    @property
+    def fps(self):
+        return self._fps
+
+
+# ---------------- URI parsing ----------------
+def canonical_uri(uri):
+    """ One spelling per physical source, so the registry never opens a device twice """
+    if isinstance(uri, int):
+        return f"device:{uri}"
+    uri = str(uri)
+    if uri.isdigit():
+        return f"device:{uri}"
+    if uri.startswith("/dev/video") and uri[len("/dev/video"):].isdigit():
+        return f"device:{uri[len('/dev/video'):]}"
+    return uri
+
+
+def _split_options(rest):
+    path, _, query = rest.partition("?")
+    return path, {k: v[-1] for k, v in parse_qs(query).items()}
+
+
+def _flag(opts, name, default):
+    return opts.get(name, "1" if default else "0").lower() not in ("0", "false", "no")
+
+
+def open_source(uri):
+    """ Build the backend for uri (not opened yet) """
+    uri = canonical_uri(uri)
+    if uri.startswith(NETWORK_SCHEMES):
+        return NetworkSource(uri)
+
+    if uri.startswith("device:"):
+        index, opts = _split_options(uri[len("device:"):])
+        api = DEVICE_APIS.get(opts.get("api", ""), None)
+        width, height = (int(v) for v in opts["size"].split("x")) if "size" in opts else (None, None)
+        fps = float(opts["fps"]) if "fps" in opts else None
+        return DeviceSource(int(index), api=api, width=width, height=height, fps=fps)
+
+    if uri.startswith("synthetic:"):
+        spec, _ = _split_options(uri[len("synthetic:"):])
+        spec, _, pattern = spec.partition("/")
+        size, _, fps = spec.partition("@")
+        width, height = (int(v) for v in (size or "640x480").split("x"))
+        return SyntheticSource(width, height, float(fps or 30), pattern or "bars")
+
+    path = uri[len("file:"):] if uri.startswith("file:") else uri
+    if path.startswith("//"):
+        path = path[2:]  # file:///abs/path
+    path, opts = _split_options(path)
+    return FileSource(os.path.expanduser(path), loop=_flag(opts, "loop", True),
+                      realtime=_flag(opts, "realtime", True))
@@ -0,0 +1,115 @@
+# video_surface.py
+import os
+import time
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+# "label" keeps the QLabel + QPixmap path, "gl" paints frames through QOpenGLWidget
+VIDEO_SURFACE = os.getenv("GCS_VIDEO_SURFACE", "label")
+
+
+def _wrap(rgb):
+    # zero-copy QImage over a numpy RGB frame; only valid while the frame memory is not reused by the producer
+    h, w, ch = rgb.shape
+    return QtGui.QImage(rgb.data, w, h, ch * w, QtGui.QImage.Format_RGB888)
+
+
+class LabelSurface(QtWidgets.QLabel):
+    """ Raster video view: QImage -> QPixmap conversion, QLabel repaint """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(text, parent)
+        self.paint_ms = 0.0
+
+    def prepare(self, rgb):
+        return QtGui.QPixmap.fromImage(_wrap(rgb))  # copies, the frame slot may be reused after this
+
+    def present(self, pixmap):
+        self.setPixmap(pixmap)
+
+    def set_frame(self, rgb):
+        self.present(self.prepare(rgb))
+
+    def paintEvent(self, ev):
+        t0 = time.perf_counter()
+        super().paintEvent(ev)
+        self.paint_ms = 0.9 * self.paint_ms + 0.1 * 1000.0 * (time.perf_counter() - t0)
+
+
+class GLVideoSurface(QtWidgets.QOpenGLWidget):
+    """ OpenGL video view: the frame is uploaded as a texture and scaled while painting.
+
+    No QPixmap is involved; QPainter's GL engine turns the QImage into a texture and
+    draws it aspect-fit into the widget. Software Mesa (llvmpipe) is fine on Linux.
+    Mirrors the bits of the QLabel API the views use, so it is a drop-in replacement.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self._image = None
+        self._text = text
+        self._align = QtCore.Qt.AlignCenter
+        self.paint_ms = 0.0
+
+    def prepare(self, rgb):
+        return _wrap(rgb).copy()  # own the pixels, the frame slot may be reused after this
+
+    def present(self, image):
+        self._image = image
+        self.update()
+
+    def set_frame(self, rgb):
+        self.present(self.prepare(rgb))
+
+    # ---------------- QLabel look-alikes ----------------
+    def setPixmap(self, pixmap):
+        self.present(pixmap.toImage())
+
+    def setText(self, text):
+        self._image = None
+        self._text = text
+        self.update()
+
+    def text(self):
+        return self._text
+
+    def clear(self):
+        self.setText("")
+
+    def setAlignment(self, align):
+        self._align = align
+
+    # ---------------- Painting ----------------
+    def paintGL(self):
+        t0 = time.perf_counter()
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.black)
+        if self._image is not None:
+            painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            size = self._image.size().scaled(self.size(), QtCore.Qt.KeepAspectRatio)
+            target = QtCore.QRect(QtCore.QPoint(0, 0), size)
+            target.moveCenter(self.rect().center())
+            painter.drawImage(target, self._image)
+        elif self._text:
+            painter.setPen(QtGui.QColor("white"))
+            painter.drawText(self.rect(), self._align, self._text)
+        painter.end()
+        self.paint_ms = 0.9 * self.paint_ms + 0.1 * 1000.0 * (time.perf_counter() - t0)
+
+
+def create_surface(text="", parent=None):
+    if VIDEO_SURFACE == "gl":
+        return GLVideoSurface(text, parent)
+    return LabelSurface(text, parent)
+
+
+def show_latest(surface, buf, last_seq):
+    """ Put the newest frame of buf on surface; returns the seq now on screen """
+    latest = buf.latest(last_seq)
+    if latest is None:
+        return last_seq
+    seq, _, rgb = latest
+    frame = surface.prepare(rgb)
+    if not buf.is_fresh(seq):
+        return last_seq  # producer lapped us mid-copy, next tick shows a clean frame
+    surface.present(frame)
+    return seq
@@ -0,0 +1,265 @@
+# video_worker.py
+import os
+import time
+import threading
+import cv2
+from PyQt5 import QtCore
+
+from frame_buffer import FrameRingBuffer
+from video_process import DecodeProcess
+from video_source import canonical_uri, open_source
+
+# "thread" decodes inside the GUI process, "process" gives every source its own decode process
+DECODE_MODE = os.getenv("GCS_DECODE_MODE", "thread")
+
+
+class Subscription:
+    """ One rendered output of a shared capture: a target size and the ring buffer it lands in """
+
+    def __init__(self, size, letterbox=False):
+        self.size = tuple(size)
+        self.letterbox = letterbox
+        self.refs = 0
+        w, h = self.size
+        self.buffer = FrameRingBuffer((h, w, 3))
+        self._src_shape = None
+        self._roi = (0, 0, w, h)  # x, y, w, h of the picture inside the output
+
+    def _layout(self, src_h, src_w):
+        # letterbox geometry only changes with the source resolution, not per frame
+        w, h = self.size
+        if self.letterbox:
+            scale = min(w / src_w, h / src_h)
+            sw, sh = max(1, int(src_w * scale)), max(1, int(src_h * scale))
+            self._roi = ((w - sw) // 2, (h - sh) // 2, sw, sh)
+            self.buffer.fill(0)  # bars stay black, frames only ever overwrite the picture area
+        self._src_shape = (src_h, src_w)
+
+    def render(self, frame, bgr=False):
+        """ Scale frame into the next slot with a single cv2.resize; bgr frames are swapped in place """
+        if frame.shape[:2] != self._src_shape:
+            self._layout(*frame.shape[:2])
+        x, y, sw, sh = self._roi
+        roi = self.buffer.write_slot()[y:y + sh, x:x + sw]
+        cv2.resize(frame, (sw, sh), dst=roi, interpolation=cv2.INTER_AREA)
+        if bgr:
+            # swapping channels after scaling touches far fewer pixels than converting the source
+            cv2.cvtColor(roi, cv2.COLOR_BGR2RGB, dst=roi)
+
+
+class CaptureWorker(QtCore.QThread):
+    """ Owns one video source: decodes each frame once, then renders it for every subscription """
+
+    opened = QtCore.pyqtSignal(bool)          # emitted once the source open attempt finished
+    frame_ready = QtCore.pyqtSignal()         # every subscription buffer got a new frame
+    stats_updated = QtCore.pyqtSignal(dict)   # decode_ms / fps (+ drift for files), about once per second
+
+    def __init__(self, source, use_process=False, parent=None):
+        super().__init__(parent)
+        self.source = source  # URI, see video_source.open_source
+        self.use_process = use_process
+        self.is_open = None  # None until the open attempt finished
+
+        self._running = False
+        self._lock = threading.Lock()
+        self._subs = ()  # copy-on-write, the worker thread iterates it without locking
+        self._taps = ()  # callables fed every decoded frame (recorders), same scheme
+        self._seek_ms = None  # pending seek, applied on the worker thread
+        self._proc = None
+
+        self.decode_ms = 0.0
+        self.fps = 0.0
+
+    # ---------------- Subscriptions ----------------
+    def acquire(self, size, letterbox=False):
+        """ Get (and reference) the output for size/letterbox, shared with identical views """
+        with self._lock:
+            for sub in self._subs:
+                if sub.size == tuple(size) and sub.letterbox == letterbox:
+                    break
+            else:
+                sub = Subscription(size, letterbox)
+                self._subs = self._subs + (sub,)
+            sub.refs += 1
+            return sub
+
+    def release(self, sub):
+        """ Drop one reference to sub; returns how many subscriptions are left on this source """
+        with self._lock:
+            sub.refs -= 1
+            if sub.refs <= 0:
+                self._subs = tuple(s for s in self._subs if s is not sub)
+            return len(self._subs)
+
+    def add_tap(self, fn):
+        """ fn(frame, stamp, bgr) runs on the capture thread for every frame; it must not block
+        and must copy the frame if it keeps it """
+        with self._lock:
+            self._taps = self._taps + (fn,)
+
+    def remove_tap(self, fn):
+        with self._lock:
+            self._taps = tuple(t for t in self._taps if t != fn)  # bound methods compare by ==
+
+    def seek(self, ms):
+        """ Jump a file source to ms (no-op for live sources); safe to call from the GUI thread """
+        self._seek_ms = ms
+        if self._proc is not None:
+            self._proc.seek(ms)
+            self._seek_ms = None
+
+    def start(self, *args):
+        # set here, not in run(): a stop() that lands before the source is open must stick
+        self._running = True
+        super().start(*args)
+
+    def stop(self):
+        self._running = False
+        self.wait(1000)
+
+    # ---------------- Worker thread ----------------
+    def run(self):
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+        self._window_decode = 0.0
+        self._source_stats = dict
+        if self.use_process:
+            self._run_process()
+        else:
+            self._run_inprocess()
+
+    def _run_inprocess(self):
+        src = open_source(self.source)
+        self.is_open = src.open()
+        self.opened.emit(self.is_open)
+        if not self.is_open:
+            src.release()
+            return
+        self._source_stats = src.stats
+
+        while self._running:
+            if self._seek_ms is not None:
+                ms, self._seek_ms = self._seek_ms, None
+                src.seek(ms)
+            src.pace()  # files and synthetic feeds wait for their next frame time here
+            t0 = time.perf_counter()
+            ret, frame = src.read()
+            if not ret:
+                self.msleep(10)
+                continue
+            subs = self._subs  # one snapshot per frame: publish exactly the outputs that were rendered
+            self._render(subs, frame, bgr=True)
+            self._tap(frame, True)
+            self._publish(subs, time.monotonic(), time.perf_counter() - t0)
+
+        src.release()
+
+    def _run_process(self):
+        # decode + colour conversion happen in the child; we only resize out of shared memory
+        proc = DecodeProcess(self.source)
+        self.is_open = proc.start()
+        if self.is_open:
+            self._proc = proc
+            if self._seek_ms is not None:
+                proc.seek(self._seek_ms)
+                self._seek_ms = None
+        self.opened.emit(self.is_open)
+        if not self.is_open:
+            return
+
+        ring = proc.ring
+        self._source_stats = ring.source_stats
+        last_seq = 0
+        while self._running:
+            if not proc.wait_frame(0.1):
+                continue
+            latest = ring.latest(last_seq)
+            if latest is None:
+                continue
+            seq, stamp, rgb = latest
+            t0 = time.perf_counter()
+            subs = self._subs
+            self._render(subs, rgb)
+            self._tap(rgb, False)
+            if not ring.is_fresh(seq):
+                continue  # the decoder lapped this slot while we were resizing it
+            last_seq = seq
+            self._publish(subs, stamp, ring.decode_ms / 1000.0 + time.perf_counter() - t0)
+
+        self._source_stats = dict
+        latest = rgb = ring = None  # no views into shared memory may outlive proc.stop()
+        self._proc = None
+        proc.stop()
+
+    def _render(self, subs, frame, bgr=False):
+        for sub in subs:
+            sub.render(frame, bgr)
+
+    def _tap(self, frame, bgr):
+        stamp = time.monotonic()
+        for tap in self._taps:
+            tap(frame, stamp, bgr)
+
+    def _publish(self, subs, stamp, decode_s):
+        # stamp is when the frame finished decoding, readers use it to measure latency
+        for sub in subs:
+            sub.buffer.publish(stamp)
+        self.frame_ready.emit()
+
+        # per-source stats, published about once per second
+        self._window_frames += 1
+        self._window_decode += decode_s
+        now = time.perf_counter()
+        if now - self._window_start >= 1.0:
+            self.decode_ms = 1000.0 * self._window_decode / self._window_frames
+            self.fps = self._window_frames / (now - self._window_start)
+            stats = {"decode_ms": self.decode_ms, "fps": self.fps}
+            stats.update(self._source_stats())
+            self.stats_updated.emit(stats)
+            self._window_start, self._window_frames, self._window_decode = now, 0, 0.0
+
+
+class SourceRegistry:
+    """ Opens each physical source once and fans its frames out to every subscribed view.
+
+    Sources are keyed by canonical URI (see video_source), so 0, "0" and "device:0" are
+    one capture. The worker starts with the first subscriber and stops when the last
+    one unsubscribes.
+    """
+
+    def __init__(self, use_process=False):
+        self.use_process = use_process
+        self._workers = {}
+
+    def subscribe(self, source, size, letterbox=False):
+        """ Returns (worker, subscription); read frames from subscription.buffer """
+        source = canonical_uri(source)
+        worker = self._workers.get(source)
+        if worker is None:
+            worker = CaptureWorker(source, use_process=self.use_process)
+            self._workers[source] = worker
+            sub = worker.acquire(size, letterbox)
+            worker.start()
+        else:
+            sub = worker.acquire(size, letterbox)
+            if worker.is_open is False and not worker.isRunning():
+                worker.start()  # last open attempt failed, try the source again
+        return worker, sub
+
+    def unsubscribe(self, source, sub):
+        source = canonical_uri(source)
+        worker = self._workers.get(source)
+        if worker is None:
+            return
+        if worker.release(sub) == 0:
+            del self._workers[source]
+            worker.stop()
+
+    def stop_all(self):
+        for worker in self._workers.values():
+            worker.stop()
+        self._workers.clear()
+
+
+# one registry for the whole app, so every tab shares the same captures
+registry = SourceRegistry(use_process=DECODE_MODE == "process")